@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+
+from TTS.tts.datasets.feature_store import build_feature_store
+from TTS.tts.datasets.preprocess import load_meta_data
+from TTS.tts.datasets.TTSDataset import MyDataset
+from TTS.utils.audio import AudioProcessor
+from TTS.utils.io import load_config
+
+
+def main():
+    """Compute the training features of a dataset once and store them in memory-mapped shards."""
+    parser = argparse.ArgumentParser(
+        description='Compute token sequences, spectrograms and attention masks of the train and eval '
+                    'items of a TTS config and save them to a feature store. Set "feature_store_path" '
+                    'in the config to train from it without reading audio files.')
+    parser.add_argument('--config_path', type=str, required=True,
+                        help='TTS config file path.')
+    parser.add_argument('--out_path', type=str, required=True,
+                        help='feature store folder.')
+    parser.add_argument('--compute_linear_spec', action='store_true',
+                        help='store linear spectrograms too. Needed by Tacotron.')
+    parser.add_argument('--num_workers', type=int, default=0,
+                        help='number of processes computing features.')
+    parser.add_argument('--shard_size', type=int, default=1024,
+                        help='max size of a shard file in MB.')
+    args = parser.parse_args()
+
+    c = load_config(args.config_path)
+    ap = AudioProcessor(**c.audio)
+    meta_data_train, meta_data_eval = load_meta_data(
+        c.datasets, cache_path=c['dataset_index_path'] if 'dataset_index_path' in c.keys() else None,
+        num_workers=args.num_workers)
+    dataset = MyDataset(
+        1,
+        c.text_cleaner,
+        compute_linear_spec=args.compute_linear_spec or c.model.lower() == 'tacotron',
+        meta_data=meta_data_train + meta_data_eval,
+        ap=ap,
+        tp=c.characters if 'characters' in c.keys() else None,
+        add_blank=c['add_blank'] if 'add_blank' in c.keys() else False,
+        phoneme_cache_path=c.phoneme_cache_path,
+        use_phonemes=c.use_phonemes,
+        phoneme_language=c.phoneme_language,
+        enable_eos_bos=False,
+        verbose=True)
+    if c.use_phonemes:
+        dataset.compute_input_seq(args.num_workers)
+    print(f" > Computing features of {len(dataset)} items.")
+    build_feature_store(dataset, args.out_path, args.num_workers, args.shard_size * 2**20)
+
+
+if __name__ == "__main__":
+    main()
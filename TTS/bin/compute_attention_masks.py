@@ -105,7 +105,7 @@ Example run:
                         phoneme_language=C.phoneme_language,
                         enable_eos_bos=C.enable_eos_bos_chars)
 
-    dataset.sort_items()
+    dataset.sort_items(4)
     loader = DataLoader(dataset,
                         batch_size=args.batch_size,
                         num_workers=4,
@@ -43,6 +43,9 @@ parser.add_argument(
 parser.add_argument(
     '--separator', type=str, help='Separator used in file if CSV is passed for data_path', default='|'
 )
+parser.add_argument(
+    '--streaming', action='store_true', help='compute spectrograms reading the audio block by block to limit memory on long recordings. Files must be at the config sample rate.'
+)
 args = parser.parse_args()
 
 
@@ -109,7 +112,10 @@ for idx, wav_file in enumerate(tqdm(wav_files)):
         speaker_name = wav_file[2]
         wav_file = wav_file[1]
 
-    mel_spec = ap.melspectrogram(ap.load_wav(wav_file, sr=ap.sample_rate)).T
+    if args.streaming:
+        mel_spec = np.concatenate([mel for mel, _ in ap.stream_spectrograms(wav_file)], axis=1).T
+    else:
+        mel_spec = ap.melspectrogram(ap.load_wav(wav_file, sr=ap.sample_rate)).T
     mel_spec = torch.FloatTensor(mel_spec[None, :, :])
     if args.use_cuda:
         mel_spec = mel_spec.cuda()
@@ -21,6 +21,9 @@ def main():
                         help="TTS config file path to define audio processin parameters.")
     parser.add_argument("--out_path", default=None, type=str,
                         help="directory to save the output file.")
+    parser.add_argument("--streaming", action="store_true",
+                        help="read audio files block by block to limit memory on long recordings. "
+                             "Silence trimming, sound normalization and resampling are not applied.")
     args = parser.parse_args()
 
     # load config
@@ -45,16 +48,20 @@ def main():
     N = 0
     for item in tqdm(dataset_items):
         # compute features
-        wav = ap.load_wav(item if isinstance(item, str) else item[1])
-        linear = ap.spectrogram(wav)
-        mel = ap.melspectrogram(wav)
-
-        # compute stats
-        N += mel.shape[1]
-        mel_sum += mel.sum(1)
-        linear_sum += linear.sum(1)
-        mel_square_sum += (mel ** 2).sum(axis=1)
-        linear_square_sum += (linear ** 2).sum(axis=1)
+        wav_file = item if isinstance(item, str) else item[1]
+        if args.streaming:
+            features = ap.stream_spectrograms(wav_file, compute_linear=True)
+        else:
+            wav = ap.load_wav(wav_file)
+            features = [(ap.melspectrogram(wav), ap.spectrogram(wav))]
+
+        for mel, linear in features:
+            # compute stats
+            N += mel.shape[1]
+            mel_sum += mel.sum(1)
+            linear_sum += linear.sum(1)
+            mel_square_sum += (mel ** 2).sum(axis=1)
+            linear_square_sum += (linear ** 2).sum(axis=1)
 
     mel_mean = mel_sum / N
     mel_scale = np.sqrt(mel_square_sum / N - mel_mean ** 2)
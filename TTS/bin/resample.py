@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+import argparse
+import glob
+import os
+from functools import partial
+from multiprocessing import Pool
+
+import soundfile as sf
+from tqdm import tqdm
+
+from TTS.utils.audio import read_audio
+
+
+def resample_file(paths, output_sr, subtype):
+    input_path, output_path = paths
+    wav, _ = read_audio(input_path, sr=output_sr)
+    os.makedirs(os.path.dirname(output_path), exist_ok=True)
+    sf.write(output_path, wav, output_sr, subtype=subtype)
+
+
+def main():
+    """Resample all the audio files of a dataset once, so that training
+    never resamples on the fly."""
+    parser = argparse.ArgumentParser(
+        description='Resample audio files to a common sample rate. Output files are saved as wav under '
+                    'the same relative paths.')
+    parser.add_argument('--input_dir', type=str, required=True,
+                        help='root folder of the dataset.')
+    parser.add_argument('--output_dir', type=str, required=True,
+                        help='folder to save the resampled files. Can be input_dir to overwrite wav files in place.')
+    parser.add_argument('--output_sr', type=int, required=True,
+                        help='target sample rate.')
+    parser.add_argument('--file_ext', type=str, default='wav',
+                        help='extension of the input files, e.g. wav, flac or mp3.')
+    parser.add_argument('--subtype', type=str, default='PCM_16',
+                        help='soundfile subtype of the output files.')
+    parser.add_argument('--n_jobs', type=int, default=None,
+                        help='number of parallel processes. Defaults to the number of CPUs.')
+    args = parser.parse_args()
+
+    input_files = glob.glob(os.path.join(args.input_dir, '**', f'*.{args.file_ext}'), recursive=True)
+    print(f" > Resampling {len(input_files)} files to {args.output_sr} Hz.")
+    paths = []
+    for input_file in input_files:
+        relative_path = os.path.splitext(os.path.relpath(input_file, args.input_dir))[0] + '.wav'
+        paths.append((input_file, os.path.join(args.output_dir, relative_path)))
+    with Pool(args.n_jobs) as p:
+        list(tqdm(p.imap_unordered(partial(resample_file, output_sr=args.output_sr, subtype=args.subtype), paths),
+                  total=len(paths)))
+    print(f" > Done. Set 'resample' to false in the audio config of datasets under {args.output_dir}.")
+
+
+if __name__ == "__main__":
+    main()
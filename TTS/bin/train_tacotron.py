@@ -14,6 +14,7 @@ import torch
 from torch.utils.data import DataLoader
 from TTS.tts.datasets.preprocess import load_meta_data
 from TTS.tts.datasets.TTSDataset import MyDataset
+from TTS.tts.datasets.sampler import BucketBatchSampler, padding_ratio
 from TTS.tts.layers.losses import TacotronLoss
 from TTS.tts.utils.generic_utils import check_config_tts, setup_model
 from TTS.tts.utils.io import save_best_model, save_checkpoint
@@ -60,25 +61,39 @@ def setup_loader(ap, r, is_val=False, verbose=False, dataset=None):
                 use_phonemes=c.use_phonemes,
                 phoneme_language=c.phoneme_language,
                 enable_eos_bos=c.enable_eos_bos_chars,
+                feature_store_path=c['feature_store_path'] if 'feature_store_path' in c.keys() else None,
+                audio_durations=audio_durations,
                 verbose=verbose,
                 speaker_mapping=speaker_mapping if c.use_speaker_embedding and c.use_external_speaker_embedding_file else None)
 
             if c.use_phonemes and c.compute_input_seq_cache:
                 # precompute phonemes to have a better estimate of sequence lengths.
                 dataset.compute_input_seq(c.num_loader_workers)
-            dataset.sort_items()
-
-        sampler = DistributedSampler(dataset) if num_gpus > 1 else None
-        loader = DataLoader(
-            dataset,
-            batch_size=c.eval_batch_size if is_val else c.batch_size,
-            shuffle=False,
-            collate_fn=dataset.collate_fn,
-            drop_last=False,
-            sampler=sampler,
-            num_workers=c.num_val_loader_workers
-            if is_val else c.num_loader_workers,
-            pin_memory=False)
+            dataset.sort_items(c.num_loader_workers)
+
+        batch_max_frames = c['batch_max_frames'] if 'batch_max_frames' in c.keys() else None
+        if batch_max_frames and not is_val:
+            # batches of items with similar mel lengths under a budget of padded frames
+            batch_sampler = BucketBatchSampler(dataset.mel_lengths(), batch_max_frames,
+                                               num_replicas=max(num_gpus, 1), rank=args.rank)
+            loader = DataLoader(
+                dataset,
+                batch_sampler=batch_sampler,
+                collate_fn=dataset.collate_fn,
+                num_workers=c.num_loader_workers,
+                pin_memory=False)
+        else:
+            sampler = DistributedSampler(dataset) if num_gpus > 1 else None
+            loader = DataLoader(
+                dataset,
+                batch_size=c.eval_batch_size if is_val else c.batch_size,
+                shuffle=False,
+                collate_fn=dataset.collate_fn,
+                drop_last=False,
+                sampler=sampler,
+                num_workers=c.num_val_loader_workers
+                if is_val else c.num_loader_workers,
+                pin_memory=False)
     return loader
 
 def format_data(data):
@@ -135,11 +150,8 @@ def train(data_loader, model, criterion, optimizer, optimizer_st, scheduler,
     model.train()
     epoch_time = 0
     keep_avg = KeepAverage()
-    if use_cuda:
-        batch_n_iter = int(
-            len(data_loader.dataset) / (c.batch_size * num_gpus))
-    else:
-        batch_n_iter = int(len(data_loader.dataset) / c.batch_size)
+    # batches per process, also with dynamic batch sizes
+    batch_n_iter = len(data_loader)
     end_time = time.time()
     c_logger.print_train_start()
     for num_iter, data in enumerate(data_loader):
@@ -252,6 +264,8 @@ def train(data_loader, model, criterion, optimizer, optimizer_st, scheduler,
             update_train_values['avg_' + key] = value
         update_train_values['avg_loader_time'] = loader_time
         update_train_values['avg_step_time'] = step_time
+        update_train_values['avg_padding_ratio'] = padding_ratio(mel_lengths, mel_input.shape[1])
+        update_train_values['avg_steps_per_sec'] = 1.0 / (step_time + loader_time)
         keep_avg.update_values(update_train_values)
 
         # print training progress
@@ -261,6 +275,7 @@ def train(data_loader, model, criterion, optimizer, optimizer_st, scheduler,
                 "max_text_length": [max_text_length, 1],
                 "step_time": [step_time, 4],
                 "loader_time": [loader_time, 2],
+                "padding_ratio": [update_train_values['avg_padding_ratio'], 4],
                 "current_lr": current_lr,
             }
             c_logger.print_train_step(batch_n_iter, num_iter, global_step,
@@ -274,7 +289,9 @@ def train(data_loader, model, criterion, optimizer, optimizer_st, scheduler,
                     "lr": current_lr,
                     "grad_norm": grad_norm,
                     "grad_norm_st": grad_norm_st,
-                    "step_time": step_time
+                    "step_time": step_time,
+                    "padding_ratio": update_train_values['avg_padding_ratio'],
+                    "steps_per_sec": update_train_values['avg_steps_per_sec']
                 }
                 iter_stats.update(loss_dict)
                 tb_logger.tb_train_iter_stats(global_step, iter_stats)
@@ -494,7 +511,7 @@ def evaluate(data_loader, model, criterion, ap, global_step, epoch):
 # FIXME: move args definition/parsing inside of main?
 def main(args):  # pylint: disable=redefined-outer-name
     # pylint: disable=global-variable-undefined
-    global meta_data_train, meta_data_eval, symbols, phonemes, speaker_mapping
+    global meta_data_train, meta_data_eval, audio_durations, symbols, phonemes, speaker_mapping
     # Audio processor
     ap = AudioProcessor(**c.audio)
     if 'characters' in c.keys():
@@ -507,7 +524,9 @@ def main(args):  # pylint: disable=redefined-outer-name
     num_chars = len(phonemes) if c.use_phonemes else len(symbols)
 
     # load data instances
-    meta_data_train, meta_data_eval = load_meta_data(c.datasets)
+    meta_data_train, meta_data_eval, audio_durations = load_meta_data(
+        c.datasets, cache_path=c['dataset_index_path'] if 'dataset_index_path' in c.keys() else None,
+        num_workers=c.num_loader_workers, return_durations=True)
 
     # set the portion of the data used for training
     if 'train_portion' in c.keys():
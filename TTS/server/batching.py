@@ -0,0 +1,120 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future
+
+
+class _Request(object):
+    """Sentences of a single client request waiting for synthesis."""
+    def __init__(self, sentences, speaker_idx):
+        self.sentences = sentences
+        self.speaker_idx = speaker_idx
+        self.future = Future()
+        self.wavs = [None] * len(sentences)
+        self.num_pending = len(sentences)
+
+    def set_wav(self, idx, wav):
+        self.wavs[idx] = wav
+        self.num_pending -= 1
+        if self.num_pending == 0 and not self.future.done():
+            self.future.set_result(self.wavs)
+
+    def set_exception(self, exception):
+        if not self.future.done():
+            self.future.set_exception(exception)
+
+
+class BatchScheduler(object):
+    def __init__(self, synthesize_fn, max_batch_size=8, max_wait_ms=10, max_queue_size=64):
+        """Dynamic micro-batching of sentences coming from concurrent requests.
+
+        A worker thread waits for the first pending request, then keeps collecting
+        requests for at most ``max_wait_ms`` or until ``max_batch_size`` sentences are
+        gathered. Collected sentences are grouped by speaker, sorted by length to keep
+        padding low, and passed to ``synthesize_fn`` in chunks of ``max_batch_size``.
+        Each request gets back its own waveforms in the original sentence order.
+        Requests cancelled before they are collected are not synthesized.
+        If ``synthesize_fn`` raises, all the requests of the current round get the exception.
+
+        Args:
+            synthesize_fn (callable): ``fn(sentences, speaker_idx)`` returning one waveform per sentence,
+                e.g. ``Synthesizer.tts_batch``.
+            max_batch_size (int, optional): maximum number of sentences per model call. Defaults to 8.
+            max_wait_ms (float, optional): time to wait for more requests once the first one arrives. Defaults to 10.
+            max_queue_size (int, optional): maximum number of pending requests. Defaults to 64.
+        """
+        self.synthesize_fn = synthesize_fn
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000.0
+        self.queue = queue.Queue(maxsize=max_queue_size)
+        self.worker = threading.Thread(target=self._run, daemon=True)
+        self.worker.start()
+
+    def submit(self, sentences, speaker_idx=None):
+        """Queue sentences for synthesis.
+
+        Raises:
+            queue.Full: if ``max_queue_size`` requests are already pending.
+
+        Returns:
+            concurrent.futures.Future: resolves to the list of waveforms, one per sentence.
+        """
+        request = _Request(list(sentences), speaker_idx)
+        if not request.sentences:
+            request.future.set_result([])
+            return request.future
+        self.queue.put_nowait(request)
+        return request.future
+
+    def _collect(self):
+        requests = []
+        num_sentences = 0
+        deadline = None
+        while num_sentences < self.max_batch_size:
+            if deadline is None:
+                request = self.queue.get()
+            else:
+                timeout = deadline - time.time()
+                if timeout <= 0:
+                    break
+                try:
+                    request = self.queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+            # drop requests cancelled while queued. Once running, they cannot be
+            # cancelled anymore, so setting their result never races with cancel()
+            if not request.future.set_running_or_notify_cancel():
+                continue
+            if deadline is None:
+                deadline = time.time() + self.max_wait
+            requests.append(request)
+            num_sentences += len(request.sentences)
+        return requests
+
+    def _run(self):
+        while True:
+            requests = self._collect()
+            try:
+                self._synthesize(requests)
+            except Exception as e:  # pylint: disable=broad-except
+                # fail every request of the round instead of leaving callers waiting
+                for request in requests:
+                    request.set_exception(e)
+
+    def _synthesize(self, requests):
+        # sentences of different speakers cannot share a batch
+        groups = {}
+        for request in requests:
+            for idx, sen in enumerate(request.sentences):
+                groups.setdefault(request.speaker_idx, []).append((request, idx, sen))
+        for speaker_idx, items in groups.items():
+            # sort by length to batch sentences of similar padded length
+            items.sort(key=lambda item: len(item[2]))
+            for offset in range(0, len(items), self.max_batch_size):
+                # skip sentences of requests that already failed
+                batch = [item for item in items[offset:offset + self.max_batch_size] if not item[0].future.done()]
+                if not batch:
+                    continue
+                wavs = self.synthesize_fn([sen for _, _, sen in batch], speaker_idx)
+                for (request, idx, _), wav in zip(batch, wavs):
+                    request.set_wav(idx, wav)
@@ -3,9 +3,13 @@ import argparse
 import os
 import sys
 import io
+import queue
+from concurrent.futures import TimeoutError as FutureTimeoutError
 from pathlib import Path
 
-from flask import Flask, render_template, request, send_file
+from flask import Flask, Response, jsonify, render_template, request, send_file, stream_with_context
+from TTS.server.batching import BatchScheduler
+from TTS.tts.utils.text import setup_phoneme_cache
 from TTS.utils.synthesizer import Synthesizer
 from TTS.utils.manage import ModelManager
 from TTS.utils.io import load_config
@@ -28,6 +32,12 @@ def create_argparser():
     parser.add_argument('--use_cuda', type=convert_boolean, default=False, help='true to use CUDA.')
     parser.add_argument('--debug', type=convert_boolean, default=False, help='true to enable Flask debug mode.')
     parser.add_argument('--show_details', type=convert_boolean, default=False, help='Generate model detail page.')
+    parser.add_argument('--max_batch_size', type=int, default=1, help='max number of sentences synthesized together across concurrent requests. 1 disables batching.')
+    parser.add_argument('--max_wait_ms', type=float, default=10, help='time to wait for more requests before running a batch.')
+    parser.add_argument('--phoneme_cache_size', type=int, default=10000, help='number of phonemized texts kept in memory.')
+    parser.add_argument('--phoneme_store_path', type=str, default=None, help='path to a SQLite file persisting phonemized texts across restarts and workers.')
+    parser.add_argument('--max_queue_size', type=int, default=64, help='max number of requests waiting for synthesis. Further requests get 503.')
+    parser.add_argument('--request_timeout', type=float, default=60, help='seconds to wait for a batched synthesis before answering 503.')
     return parser
 
 synthesizer = None
@@ -74,8 +84,13 @@ if not args.vocoder_checkpoint and os.path.isfile(vocoder_checkpoint_file):
 if not args.vocoder_config and os.path.isfile(vocoder_config_file):
     args.vocoder_config = vocoder_config_file
 
+phoneme_cache = setup_phoneme_cache(args.phoneme_cache_size, args.phoneme_store_path)
 synthesizer = Synthesizer(args.tts_checkpoint, args.tts_config, args.vocoder_checkpoint, args.vocoder_config, args.use_cuda)
 
+scheduler = None
+if args.max_batch_size > 1:
+    scheduler = BatchScheduler(synthesizer.tts_batch, args.max_batch_size, args.max_wait_ms, args.max_queue_size)
+
 app = Flask(__name__)
 
 
@@ -98,14 +113,54 @@ def details():
                            , args=args.__dict__
                           )
 
+def get_audio_encoder():
+    """Encoder of the ``format`` and ``sample_rate`` query arguments."""
+    return synthesizer.audio_encoder(request.args.get('format', 'wav'), request.args.get('sample_rate', type=int))
+
+
 @app.route('/api/tts', methods=['GET'])
 def tts():
     text = request.args.get('text')
     print(" > Model input: {}".format(text))
-    wavs = synthesizer.tts(text)
-    out = io.BytesIO()
-    synthesizer.save_wav(wavs, out)
-    return send_file(out, mimetype='audio/wav')
+    try:
+        encoder = get_audio_encoder()
+    except ValueError as e:
+        return str(e), 400
+    if scheduler is not None:
+        try:
+            future = scheduler.submit(synthesizer.split_into_sentences(text))
+        except queue.Full:
+            return 'Server is busy, try again later.', 503
+        try:
+            wavs = synthesizer.merge_sentences(future.result(timeout=args.request_timeout))
+        except FutureTimeoutError:
+            # only drops the request if it is still queued
+            future.cancel()
+            return 'Synthesis timed out, try again later.', 503
+    else:
+        wavs = synthesizer.tts(text)
+    out = io.BytesIO(synthesizer.encode(wavs, encoder))
+    return send_file(out, mimetype=encoder.mimetype)
+
+
+@app.route('/api/tts-stream', methods=['GET'])
+def tts_stream():
+    """Stream the audio in the requested format, one chunk per sentence, using
+    chunked transfer encoding. The first bytes of audio are sent as soon as the
+    first sentence is vocoded and encoded."""
+    text = request.args.get('text')
+    print(" > Model input: {}".format(text))
+    try:
+        encoder = get_audio_encoder()
+    except ValueError as e:
+        return str(e), 400
+    generate = synthesizer.tts_stream_encoded(text, encoder)
+    return Response(stream_with_context(generate), mimetype=encoder.mimetype)
+
+
+@app.route('/api/phoneme_cache', methods=['GET'])
+def phoneme_cache_stats():
+    return jsonify(phoneme_cache.stats())
 
 
 def main():
@@ -160,8 +160,13 @@ class MyDataset(Dataset):
 
             # get a random subset of each of the wavs and convert to MFCC.
             offsets_ = [random.randint(0, wav.shape[0] - self.seq_len) for wav in wavs_]
-            mels_ = [self.ap.melspectrogram(wavs_[i][offsets_[i]: offsets_[i] + self.seq_len]) for i in range(len(wavs_))]
-            feats_ = [torch.FloatTensor(mel) for mel in mels_]
+            if self.ap.stft_backend == 'torch':
+                # all segments have seq_len samples, compute them in a single batch
+                segments_ = numpy.stack([wavs_[i][offsets_[i]: offsets_[i] + self.seq_len] for i in range(len(wavs_))])
+                feats_ = list(self.ap.spectrograms_torch(segments_)[0])
+            else:
+                mels_ = [self.ap.melspectrogram(wavs_[i][offsets_[i]: offsets_[i] + self.seq_len]) for i in range(len(wavs_))]
+                feats_ = [torch.FloatTensor(mel) for mel in mels_]
 
             labels.append(labels_)
             feats.extend(feats_)
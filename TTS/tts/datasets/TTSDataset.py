@@ -1,15 +1,16 @@
-import collections
+import collections.abc
 import os
 import random
-from multiprocessing import Manager, Pool
+from multiprocessing import Pool
 
 import numpy as np
 import torch
 import tqdm
 from torch.utils.data import Dataset
-from TTS.tts.utils.data import (prepare_data, prepare_stop_target,
-                                prepare_tensor)
-from TTS.tts.utils.text import (pad_with_eos_bos, phoneme_to_sequence,
+from TTS.tts.datasets.dataset_index import file_stats
+from TTS.tts.datasets.feature_store import FeatureStore
+from TTS.tts.datasets.phoneme_sequence_cache import PhonemeSequenceCache
+from TTS.tts.utils.text import (pad_with_eos_bos, phoneme_to_sequence_batch,
                                 text_to_sequence)
 
 
@@ -28,9 +29,13 @@ class MyDataset(Dataset):
                  use_phonemes=True,
                  phoneme_cache_path=None,
                  phoneme_language="en-us",
+                 phonemize_batch_size=1024,
                  enable_eos_bos=False,
                  speaker_mapping=None,
                  use_noise_augment=False,
+                 feature_store_path=None,
+                 audio_durations=None,
+                 pin_memory=False,
                  verbose=False):
         """
         Args:
@@ -45,11 +50,21 @@ class MyDataset(Dataset):
                 by the loader.
             max_seq_len (int): (float("inf")) maximum sequence length.
             use_phonemes (bool): (true) if true, text converted to phonemes.
-            phoneme_cache_path (str): path to cache phoneme features.
+            phoneme_cache_path (str): folder of the phoneme cache file ``phonemes.bin``.
             phoneme_language (str): one the languages from
                 https://github.com/bootphon/phonemizer#languages
+            phonemize_batch_size (int): (1024) number of texts phonemized in a single
+                phonemizer call by ``compute_input_seq()``.
             enable_eos_bos (bool): enable end of sentence and beginning of sentences characters.
             use_noise_augment (bool): enable adding random noise to wav for augmentation.
+            feature_store_path (str): read token sequences, spectrograms and attention masks
+                from a feature store built by ``TTS/bin/build_feature_store.py`` instead of
+                computing them. Audio files are not read. The stored features are computed
+                without noise augmentation, so ``use_noise_augment`` must be disabled.
+            audio_durations (dict): audio file durations in seconds, e.g. from ``load_meta_data()``.
+                Durations of the other files are read from their headers when needed.
+            pin_memory (bool): allocate batches in pinned memory. Only with ``num_workers=0``,
+                otherwise pass ``pin_memory=True`` to the ``DataLoader``.
             verbose (bool): print diagnostic information.
         """
         self.batch_group_size = batch_group_size
@@ -69,10 +84,22 @@ class MyDataset(Dataset):
         self.enable_eos_bos = enable_eos_bos
         self.speaker_mapping = speaker_mapping
         self.use_noise_augment = use_noise_augment
+        self.audio_durations = dict(audio_durations) if audio_durations is not None else {}
+        self.pin_memory = pin_memory
         self.verbose = verbose
         self.input_seq_computed = False
+        self.phonemize_batch_size = phonemize_batch_size
         if use_phonemes and not os.path.isdir(phoneme_cache_path):
             os.makedirs(phoneme_cache_path, exist_ok=True)
+        self.feature_store = None
+        if feature_store_path is not None:
+            assert not use_noise_augment, " [!] Noise augmentation cannot be applied to the features of a feature store."
+            self.feature_store = FeatureStore(feature_store_path)
+            self.feature_store.check_params(self)
+            self._load_input_seq_from_store()
+        self.phoneme_cache = None
+        if use_phonemes and self.feature_store is None:
+            self.phoneme_cache = PhonemeSequenceCache(os.path.join(phoneme_cache_path, 'phonemes.bin'))
         if self.verbose:
             print("\n > DataLoader initialization")
             print(" | > Use phonemes: {}".format(self.use_phonemes))
@@ -89,44 +116,77 @@ class MyDataset(Dataset):
         data = np.load(filename).astype('float32')
         return data
 
-    @staticmethod
-    def _generate_and_cache_phoneme_sequence(text, cache_path, cleaners, language, tp, add_blank):
-        """generate a phoneme sequence from text.
-        since the usage is for subsequent caching, we never add bos and
+    def _phoneme_cache_key(self, text):
+        return PhonemeSequenceCache.make_key(text, [self.cleaners], self.phoneme_language, self.add_blank, self.tp)
+
+    def _phonemize(self, texts, num_workers=0):
+        """Token sequences of ``texts`` from the phoneme cache. The missing ones are
+        phonemized in a single phonemizer call and cached. We never add bos and
         eos chars here. Instead we add those dynamically later; based on the
         config option."""
-        phonemes = phoneme_to_sequence(text, [cleaners],
-                                       language=language,
-                                       enable_eos_bos=False,
-                                       tp=tp, add_blank=add_blank)
-        phonemes = np.asarray(phonemes, dtype=np.int32)
-        np.save(cache_path, phonemes)
-        return phonemes
+        keys = [self._phoneme_cache_key(text) for text in texts]
+        sequences = [self.phoneme_cache.get(key) for key in keys]
+        missing_idxs = [idx for idx, sequence in enumerate(sequences) if sequence is None]
+        if missing_idxs:
+            new_sequences = phoneme_to_sequence_batch([texts[idx] for idx in missing_idxs], [self.cleaners],
+                                                      language=self.phoneme_language,
+                                                      enable_eos_bos=False,
+                                                      tp=self.tp, add_blank=self.add_blank,
+                                                      njobs=max(1, num_workers))
+            for idx, sequence in zip(missing_idxs, new_sequences):
+                sequences[idx] = np.asarray(sequence, dtype=np.int32)
+            self.phoneme_cache.add([(keys[idx], sequences[idx]) for idx in missing_idxs])
+        return sequences
+
+    def _load_or_generate_phoneme_sequence(self, text):
+        phonemes = self._phonemize([text])[0]
+        if self.enable_eos_bos:
+            phonemes = pad_with_eos_bos(phonemes, tp=self.tp)
+        return np.asarray(phonemes, dtype=np.int32)
+
+    def _load_input_seq_from_store(self):
+        """Replace texts with the stored token sequences."""
+        for item in self.items:
+            text = self.feature_store.get('tokens', self.feature_store.index(item[1]))
+            if self.enable_eos_bos:
+                text = np.asarray(pad_with_eos_bos(text, tp=self.tp), dtype=np.int32)
+            item[0] = text
+        self.input_seq_computed = True
+
+    def _load_stored_data(self, idx):
+        """Read a sample from the feature store. Arrays are views of the memory-mapped shards."""
+        item = self.items[idx]
+        store_idx = self.feature_store.index(item[1])
+        store = self.feature_store
+        sample = {
+            'text': item[0],
+            'wav': None,
+            'mel': store.get('mel', store_idx),
+            'linear': store.get('linear', store_idx) if self.compute_linear_spec else None,
+            'attn': store.get('attn', store_idx) if len(item) == 4 else None,
+            'item_idx': item[1],
+            'speaker_name': item[2],
+            'wav_file_name': os.path.basename(item[1])
+        }
+        return sample
 
-    @staticmethod
-    def _load_or_generate_phoneme_sequence(wav_file, text, phoneme_cache_path, enable_eos_bos, cleaners, language, tp, add_blank):
-        file_name = os.path.splitext(os.path.basename(wav_file))[0]
-
-        # different names for normal phonemes and with blank chars.
-        file_name_ext = '_blanked_phoneme.npy' if add_blank else '_phoneme.npy'
-        cache_path = os.path.join(phoneme_cache_path,
-                                  file_name + file_name_ext)
-        try:
-            phonemes = np.load(cache_path)
-        except FileNotFoundError:
-            phonemes = MyDataset._generate_and_cache_phoneme_sequence(
-                text, cache_path, cleaners, language, tp, add_blank)
-        except (ValueError, IOError):
-            print(" [!] failed loading phonemes for {}. "
-                  "Recomputing.".format(wav_file))
-            phonemes = MyDataset._generate_and_cache_phoneme_sequence(
-                text, cache_path, cleaners, language, tp, add_blank)
-        if enable_eos_bos:
-            phonemes = pad_with_eos_bos(phonemes, tp=tp)
-            phonemes = np.asarray(phonemes, dtype=np.int32)
-        return phonemes
+    def compute_features(self, idx):
+        """Compute the arrays stored by ``build_feature_store()``: token sequence
+        and spectrograms [T, C], and the attention mask if there is one."""
+        sample = self.load_data(idx)
+        features = {
+            'tokens': np.asarray(sample['text'], dtype=np.int32),
+            'mel': self.ap.melspectrogram(sample['wav']).astype('float32').T,
+        }
+        if self.compute_linear_spec:
+            features['linear'] = self.ap.spectrogram(sample['wav']).astype('float32').T
+        if sample['attn'] is not None:
+            features['attn'] = np.asarray(sample['attn'], dtype=np.float32)
+        return features
 
     def load_data(self, idx):
+        if self.feature_store is not None:
+            return self._load_stored_data(idx)
         item = self.items[idx]
 
         if len(item) == 4:
@@ -139,11 +199,11 @@ class MyDataset(Dataset):
 
         # apply noise for augmentation
         if self.use_noise_augment:
-            wav = wav + (1.0 / 32768.0) * np.random.rand(*wav.shape)
+            wav = wav + (1.0 / 32768.0) * np.random.rand(*wav.shape).astype(np.float32)
 
         if not self.input_seq_computed:
             if self.use_phonemes:
-                text = self._load_or_generate_phoneme_sequence(wav_file, text, self.phoneme_cache_path, self.enable_eos_bos, self.cleaners, self.phoneme_language, self.tp, self.add_blank)
+                text = self._load_or_generate_phoneme_sequence(text)
 
             else:
                 text = np.asarray(text_to_sequence(text, [self.cleaners],
@@ -172,17 +232,12 @@ class MyDataset(Dataset):
         }
         return sample
 
-    @staticmethod
-    def _phoneme_worker(args):
-        item = args[0]
-        func_args = args[1]
-        text, wav_file, *_ = item
-        phonemes = MyDataset._load_or_generate_phoneme_sequence(wav_file, text, *func_args)
-        return phonemes
-
     def compute_input_seq(self, num_workers=0):
         """compute input sequences separately. Call it before
         passing dataset to data loader."""
+        if self.feature_store is not None:
+            # already read from the feature store
+            return
         if not self.use_phonemes:
             if self.verbose:
                 print(" | > Computing input sequences ...")
@@ -194,29 +249,76 @@ class MyDataset(Dataset):
                 self.items[idx][0] = sequence
 
         else:
-            func_args = [self.phoneme_cache_path, self.enable_eos_bos, self.cleaners, self.phoneme_language, self.tp, self.add_blank]
             if self.verbose:
                 print(" | > Computing phonemes ...")
-            if num_workers == 0:
-                for idx, item in enumerate(tqdm.tqdm(self.items)):
-                    phonemes = self._phoneme_worker([item, func_args])
-                    self.items[idx][0] = phonemes
-            else:
-                with Pool(num_workers) as p:
-                    phonemes = list(tqdm.tqdm(p.imap(MyDataset._phoneme_worker, [[item, func_args] for item in self.items]), total=len(self.items)))
-                    for idx, p in enumerate(phonemes):
-                        self.items[idx][0] = p
-
-    def sort_items(self):
-        r"""Sort instances based on text length in ascending order"""
-        lengths = np.array([len(ins[0]) for ins in self.items])
-
-        idxs = np.argsort(lengths)
+            # texts missing in the phoneme cache are phonemized with a single phonemizer call per batch
+            all_phonemes = []
+            batch_size = self.phonemize_batch_size
+            for offset in tqdm.tqdm(range(0, len(self.items), batch_size)):
+                all_phonemes += self._phonemize([item[0] for item in self.items[offset:offset + batch_size]],
+                                                num_workers)
+            for idx, phonemes in enumerate(all_phonemes):
+                if self.enable_eos_bos:
+                    phonemes = np.asarray(pad_with_eos_bos(phonemes, tp=self.tp), dtype=np.int32)
+                self.items[idx][0] = phonemes
+
+    def compute_durations(self, num_workers=0):
+        """Read the durations of the audio files missing in ``audio_durations`` from
+        their headers, in a pool of ``num_workers`` processes."""
+        wav_files = [item[1] for item in self.items if item[1] not in self.audio_durations]
+        if not wav_files:
+            return
+        if num_workers > 1:
+            with Pool(num_workers) as pool:
+                stats = pool.map(file_stats, wav_files, 256)
+        else:
+            stats = [file_stats(wav_file) for wav_file in wav_files]
+        for wav_file, (_, duration) in zip(wav_files, stats):
+            self.audio_durations[wav_file] = duration
+
+    def mel_lengths(self, num_workers=0):
+        """Number of mel frames of each item, read from the feature store or computed
+        from the audio durations, see ``file_stats()``. Silence trimming is ignored.
+        Files of unknown duration, e.g. missing ones, have length 1 and are reported."""
+        if self.feature_store is not None:
+            shapes = self.feature_store.shapes('mel')
+            return np.array([shapes[self.feature_store.index(item[1]), 0] for item in self.items])
+        self.compute_durations(num_workers)
+        durations = np.array([self.audio_durations[item[1]] for item in self.items], dtype=np.float64)
+        num_unknown = int((durations < 0).sum())
+        if num_unknown > 0:
+            print(f" | > [!] {num_unknown} audio files have an unknown duration and are sorted as the shortest.")
+        num_samples = np.round(np.maximum(durations, 0) * self.ap.sample_rate).astype(np.int64)
+        return num_samples // self.ap.hop_length + 1
+
+    def text_lengths(self):
+        """Number of input tokens of each item without phonemizing. Texts missing in the
+        phoneme cache are counted in characters."""
+        lengths = []
+        num_bos_eos = 2 if self.enable_eos_bos else 0
+        for text, *_ in self.items:
+            if not isinstance(text, str):
+                # already a token sequence
+                lengths.append(len(text))
+                continue
+            sequence = None
+            if self.phoneme_cache is not None:
+                sequence = self.phoneme_cache.get(self._phoneme_cache_key(text))
+            lengths.append(len(text) if sequence is None else len(sequence) + num_bos_eos)
+        return np.array(lengths)
+
+    def sort_items(self, num_workers=0):
+        r"""Sort instances based on mel length in ascending order and discard the ones with
+        a text length out of [min_seq_len, max_seq_len]. Audio files are not decoded."""
+        text_lengths = self.text_lengths()
+        lengths = self.mel_lengths(num_workers)
+
+        idxs = np.argsort(lengths, kind='stable')
         new_items = []
         ignored = []
-        for i, idx in enumerate(idxs):
-            length = lengths[idx]
-            if length < self.min_seq_len or length > self.max_seq_len:
+        for idx in idxs:
+            text_length = text_lengths[idx]
+            if text_length < self.min_seq_len or text_length > self.max_seq_len:
                 ignored.append(idx)
             else:
                 new_items.append(self.items[idx])
@@ -231,9 +333,11 @@ class MyDataset(Dataset):
         self.items = new_items
 
         if self.verbose:
-            print(" | > Max length sequence: {}".format(np.max(lengths)))
-            print(" | > Min length sequence: {}".format(np.min(lengths)))
-            print(" | > Avg length sequence: {}".format(np.mean(lengths)))
+            print(" | > Max length sequence: {}".format(np.max(text_lengths)))
+            print(" | > Min length sequence: {}".format(np.min(text_lengths)))
+            print(" | > Avg length sequence: {}".format(np.mean(text_lengths)))
+            print(" | > Max number of mel frames: {}".format(np.max(lengths)))
+            print(" | > Avg number of mel frames: {}".format(np.mean(lengths)))
             print(
                 " | > Num. instances discarded by max-min (max={}, min={}) seq limits: {}"
                 .format(self.max_seq_len, self.min_seq_len, len(ignored)))
@@ -245,6 +349,26 @@ class MyDataset(Dataset):
     def __getitem__(self, idx):
         return self.load_data(idx)
 
+    def _zeros(self, shape, dtype):
+        """Zero tensor of a batch, pinned if ``pin_memory``, and its numpy view to copy items into."""
+        tensor = torch.zeros(shape, dtype=dtype, pin_memory=self.pin_memory)
+        return tensor, tensor.numpy()
+
+    def _pad_frames(self, length):
+        """Round up a number of frames to a multiple of ``outputs_per_step``."""
+        remainder = length % self.outputs_per_step
+        return length + (self.outputs_per_step - remainder) if remainder > 0 else length
+
+    def _collate_frames(self, features, num_frames):
+        """Copy a list of [C, T] arrays or a [B, C, T] tensor into a zero padded [B, num_frames, C] tensor."""
+        out, out_np = self._zeros((len(features), num_frames, features[0].shape[0]), torch.float32)
+        if torch.is_tensor(features):
+            out[:, :features.shape[2]] = features.transpose(1, 2)
+        else:
+            for idx, feature in enumerate(features):
+                out_np[idx, :feature.shape[1]] = feature.T
+        return out
+
     def collate_fn(self, batch):
         r"""
             Perform preprocessing and create a final data batch:
@@ -252,94 +376,77 @@ class MyDataset(Dataset):
             2. Convert Audio signal to Spectrograms.
             3. PAD sequences wrt r.
             4. Load to Torch.
+
+            Padded outputs are allocated once and items are copied into them.
+            Stop targets are set from the lengths.
         """
 
         # Puts each data field into a tensor with outer dimension batch size
-        if isinstance(batch[0], collections.Mapping):
+        if isinstance(batch[0], collections.abc.Mapping):
 
             text_lenghts = np.array([len(d["text"]) for d in batch])
 
             # sort items with text input length for RNN efficiency
-            text_lenghts, ids_sorted_decreasing = torch.sort(
-                torch.LongTensor(text_lenghts), dim=0, descending=True)
-
-            wav = [batch[idx]['wav'] for idx in ids_sorted_decreasing]
-            item_idxs = [
-                batch[idx]['item_idx'] for idx in ids_sorted_decreasing
-            ]
-            text = [batch[idx]['text'] for idx in ids_sorted_decreasing]
-
-            speaker_name = [
-                batch[idx]['speaker_name'] for idx in ids_sorted_decreasing
-            ]
+            ids_sorted_decreasing = np.argsort(-text_lenghts, kind='stable')
+            batch = [batch[idx] for idx in ids_sorted_decreasing]
+            text_lenghts = torch.LongTensor(text_lenghts[ids_sorted_decreasing])
+
+            wav = [d['wav'] for d in batch]
+            item_idxs = [d['item_idx'] for d in batch]
+            speaker_name = [d['speaker_name'] for d in batch]
             # get speaker embeddings
             if self.speaker_mapping is not None:
-                wav_files_names = [
-                    batch[idx]['wav_file_name']
-                    for idx in ids_sorted_decreasing
-                ]
-                speaker_embedding = [
-                    self.speaker_mapping[w]['embedding']
-                    for w in wav_files_names
-                ]
+                speaker_embedding = torch.FloatTensor(
+                    [self.speaker_mapping[d['wav_file_name']]['embedding'] for d in batch])
             else:
                 speaker_embedding = None
-            # compute features
-            mel = [self.ap.melspectrogram(w).astype('float32') for w in wav]
-
-            mel_lengths = [m.shape[1] for m in mel]
-
-            # compute 'stop token' targets
-            stop_targets = [
-                np.array([0.] * (mel_len - 1) + [1.])
-                for mel_len in mel_lengths
-            ]
 
-            # PAD stop targets
-            stop_targets = prepare_stop_target(stop_targets,
-                                               self.outputs_per_step)
+            # compute features, as [C, T] arrays or [B, C, T] tensors
+            linear = None
+            if batch[0]['wav'] is None:
+                # read from the feature store
+                mel = [d['mel'].T for d in batch]
+                if self.compute_linear_spec:
+                    linear = [d['linear'].T for d in batch]
+                mel_lengths = [m.shape[1] for m in mel]
+            elif self.ap.stft_backend == 'torch':
+                wav_lengths = [w.shape[0] for w in wav]
+                wavs = np.zeros((len(wav), max(wav_lengths)), dtype=np.float32)
+                for idx, w in enumerate(wav):
+                    wavs[idx, :w.shape[0]] = w
+                mel, linear, mel_lengths = self.ap.spectrograms_torch(wavs, wav_lengths,
+                                                                      compute_linear=self.compute_linear_spec)
+                mel_lengths = mel_lengths.tolist()
+            else:
+                mel = [self.ap.melspectrogram(w).astype('float32') for w in wav]
+                if self.compute_linear_spec:
+                    linear = [self.ap.spectrogram(w).astype('float32') for w in wav]
+                mel_lengths = [m.shape[1] for m in mel]
+
+            # PAD features with longest instance wrt r, B x T x D
+            max_mel_length = self._pad_frames(max(mel_lengths))
+            mel = self._collate_frames(mel, max_mel_length)
+            if self.compute_linear_spec:
+                linear = self._collate_frames(linear, max_mel_length)
+            else:
+                linear = None
 
             # PAD sequences with longest instance in the batch
-            text = prepare_data(text).astype(np.int32)
+            text, text_np = self._zeros((len(batch), int(text_lenghts.max())), torch.long)
+            for idx, d in enumerate(batch):
+                text_np[idx, :len(d['text'])] = d['text']
 
-            # PAD features with longest instance
-            mel = prepare_tensor(mel, self.outputs_per_step)
-
-            # B x D x T --> B x T x D
-            mel = mel.transpose(0, 2, 1)
-
-            # convert things to pytorch
-            text_lenghts = torch.LongTensor(text_lenghts)
-            text = torch.LongTensor(text)
-            mel = torch.FloatTensor(mel).contiguous()
+            # 'stop token' targets are 1 at the last frame of each instance
             mel_lengths = torch.LongTensor(mel_lengths)
-            stop_targets = torch.FloatTensor(stop_targets)
-
-            if speaker_embedding is not None:
-                speaker_embedding = torch.FloatTensor(speaker_embedding)
-
-            # compute linear spectrogram
-            if self.compute_linear_spec:
-                linear = [
-                    self.ap.spectrogram(w).astype('float32') for w in wav
-                ]
-                linear = prepare_tensor(linear, self.outputs_per_step)
-                linear = linear.transpose(0, 2, 1)
-                assert mel.shape[1] == linear.shape[1]
-                linear = torch.FloatTensor(linear).contiguous()
-            else:
-                linear = None
+            stop_targets, stop_targets_np = self._zeros((len(batch), max_mel_length), torch.float32)
+            stop_targets_np[np.arange(len(batch)), mel_lengths.numpy() - 1] = 1.
 
             # collate attention alignments
             if batch[0]['attn'] is not None:
-                attns = [batch[idx]['attn'].T for idx in ids_sorted_decreasing]
-                for idx, attn in enumerate(attns):
-                    pad2 = mel.shape[1] - attn.shape[1]
-                    pad1 = text.shape[1] - attn.shape[0]
-                    attn = np.pad(attn, [[0, pad1], [0, pad2]])
-                    attns[idx] = attn
-                attns = prepare_tensor(attns, self.outputs_per_step)
-                attns = torch.FloatTensor(attns).unsqueeze(1)
+                attns, attns_np = self._zeros((len(batch), 1, text.shape[1], max_mel_length), torch.float32)
+                for idx, d in enumerate(batch):
+                    attn = d['attn'].T
+                    attns_np[idx, 0, :attn.shape[0], :attn.shape[1]] = attn
             else:
                 attns = None
             return text, text_lenghts, speaker_name, linear, mel, mel_lengths, \
@@ -0,0 +1,146 @@
+import hashlib
+import io
+import json
+import os
+
+import librosa
+import numpy as np
+import soundfile as sf
+
+# bump to invalidate the existing index files
+_INDEX_VERSION = 2
+
+# values of the ``split`` column
+TRAIN = 0
+EVAL = 1
+
+
+def _encode_strings(strings):
+    """Concatenate strings into a utf-8 buffer with offsets. None values are masked."""
+    encoded = [b'' if s is None else s.encode('utf-8') for s in strings]
+    offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+    np.cumsum([len(s) for s in encoded], out=offsets[1:])
+    data = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    is_none = np.array([s is None for s in strings], dtype=bool)
+    return data, offsets, is_none
+
+
+def _decode_strings(data, offsets, is_none):
+    data = data.tobytes()
+    offsets = offsets.tolist()
+    return [None if is_none[i] else data[offsets[i]:offsets[i + 1]].decode('utf-8')
+            for i in range(len(offsets) - 1)]
+
+
+def file_stats(wav_file):
+    """Size in bytes and duration in seconds of an audio file, read from its header.
+    Formats soundfile cannot read, e.g. mp3, are measured by librosa, which may
+    decode them. Both are -1 if the file is missing, the duration is -1 if
+    librosa cannot read it either."""
+    try:
+        file_size = os.path.getsize(wav_file)
+    except OSError:
+        return -1, -1.0
+    try:
+        info = sf.info(wav_file)
+    except RuntimeError:
+        try:
+            return file_size, float(librosa.get_duration(filename=wav_file))
+        except Exception:  # pylint: disable=broad-except
+            return file_size, -1.0
+    return file_size, info.frames / info.samplerate
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_mtime_ns, stat.st_size
+
+
+def dataset_index_key(dataset):
+    """Hash of a dataset config and of the modification times and sizes of its
+    meta files and of every folder under the dataset path. Adding, removing or
+    renaming files at any depth, e.g. ``wav48/p225/*.wav``, or changing a meta
+    file changes the key. Audio files rewritten in place are not detected."""
+    root_path = dataset['path']
+    stats = {}
+    for dir_path, _, _ in os.walk(root_path):
+        stats[dir_path] = _stat(dir_path)
+    meta_files = []
+    for key in ['meta_file_train', 'meta_file_val', 'meta_file_attn_mask']:
+        value = dataset.get(key)
+        meta_files += value if isinstance(value, list) else [value]
+    for meta_file in meta_files:
+        if isinstance(meta_file, str):
+            for path in [meta_file, os.path.join(root_path, meta_file)]:
+                stats[path] = _stat(path)
+    content = json.dumps({'version': _INDEX_VERSION, 'dataset': dataset, 'stats': stats}, sort_keys=True,
+                         default=str)
+    return hashlib.sha1(content.encode('utf-8')).hexdigest()
+
+
+class DatasetIndex(object):
+    def __init__(self, items, splits, file_sizes, durations):
+        """Items of a dataset with the size and duration of their audio files.
+
+        Args:
+            items (List[List]): ``[text, wav_file, speaker_name, (attn_file)]`` items of a preprocessor.
+            splits (List[int]): ``TRAIN`` or ``EVAL`` for each item.
+            file_sizes (List[int]): audio file sizes in bytes, -1 if unknown.
+            durations (List[float]): audio durations in seconds, -1 if unknown.
+        """
+        assert len(items) == len(splits) == len(file_sizes) == len(durations)
+        assert len(set(len(item) for item in items)) <= 1, " [!] All the items must have the same number of fields."
+        self.items = items
+        self.splits = np.asarray(splits, dtype=np.int8)
+        self.file_sizes = np.asarray(file_sizes, dtype=np.int64)
+        self.durations = np.asarray(durations, dtype=np.float32)
+
+    def __len__(self):
+        return len(self.items)
+
+    @property
+    def speaker_names(self):
+        return sorted(set(item[2] for item in self.items))
+
+    def split(self, split):
+        """Copies of the items of the given split, in the preprocessor order."""
+        return [list(self.items[idx]) for idx in np.flatnonzero(self.splits == split)]
+
+    def save(self, path):
+        """Write the index to a single npz file. Texts, file paths and attention
+        mask paths are stored as utf-8 buffers and speakers as ids."""
+        num_fields = len(self.items[0]) if self.items else 0
+        arrays = {'num_fields': np.array(num_fields), 'splits': self.splits, 'file_sizes': self.file_sizes,
+                  'durations': self.durations}
+        for field in range(num_fields):
+            values = [item[field] for item in self.items]
+            if field == 2:
+                speaker_names, speaker_ids = np.unique(np.array(values, dtype=str), return_inverse=True)
+                arrays['speaker_names'] = speaker_names
+                arrays['speaker_ids'] = speaker_ids.astype(np.int32)
+                continue
+            for name, value in zip(['data', 'offsets', 'is_none'], _encode_strings(values)):
+                arrays[f'field{field}_{name}'] = value
+        # write next to the target and rename, so that readers never see a partial file
+        tmp_path = f'{path}.{os.getpid()}.tmp'
+        with open(tmp_path, 'wb') as f:
+            np.savez(f, **arrays)
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'rb') as f:
+            arrays = dict(np.load(io.BytesIO(f.read())))
+        num_fields = int(arrays['num_fields'])
+        fields = []
+        for field in range(num_fields):
+            if field == 2:
+                fields.append(arrays['speaker_names'][arrays['speaker_ids']].tolist())
+            else:
+                fields.append(_decode_strings(*[arrays[f'field{field}_{name}'] for name in
+                                                ['data', 'offsets', 'is_none']]))
+        items = [list(item) for item in zip(*fields)]
+        return cls(items, arrays['splits'], arrays['file_sizes'], arrays['durations'])
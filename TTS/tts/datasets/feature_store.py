@@ -0,0 +1,184 @@
+import json
+import os
+
+import numpy as np
+import tqdm
+from torch.utils.data import DataLoader, Dataset
+
+# AudioProcessor attributes the stored spectrograms depend on
+_AUDIO_PARAMS = ['sample_rate', 'resample', 'num_mels', 'fft_size', 'hop_length', 'win_length', 'preemphasis',
+                 'mel_fmin', 'mel_fmax', 'spec_gain', 'stft_pad_mode', 'signal_norm', 'symmetric_norm', 'max_norm',
+                 'clip_norm', 'min_level_db', 'ref_level_db', 'do_trim_silence', 'trim_db', 'do_sound_norm',
+                 'stats_path']
+
+# dataset attributes the stored token sequences depend on
+_TEXT_PARAMS = ['use_phonemes', 'cleaners', 'phoneme_language', 'tp', 'add_blank']
+
+
+class FeatureStoreWriter(object):
+    def __init__(self, path, shard_size=2**30):
+        """Append arrays to a ``FeatureStore``.
+
+        Each field is written to raw binary shard files of at most ``shard_size``
+        bytes. An item never spans two shards.
+
+        Args:
+            path (str): output folder.
+            shard_size (int, optional): max size of a shard file in bytes. Defaults to 1GB.
+        """
+        self.path = path
+        self.shard_size = shard_size
+        self.keys = []
+        self.fields = {}
+        os.makedirs(path, exist_ok=True)
+
+    @staticmethod
+    def _new_field(value):
+        return {'dtype': value.dtype.str, 'ndim': value.ndim, 'num_shards': 0, 'file': None, 'shard_bytes': 0,
+                'shard': [], 'offset': [], 'shape': []}
+
+    def _write(self, name, value):
+        field = self.fields.setdefault(name, self._new_field(value))
+        assert value.dtype.str == field['dtype'] and value.ndim == field['ndim'], \
+            f" [!] {name} should be a {field['ndim']}d {field['dtype']} array."
+        if field['file'] is None or field['shard_bytes'] + value.nbytes > self.shard_size:
+            if field['file'] is not None:
+                field['file'].close()
+            field['file'] = open(os.path.join(self.path, f"{name}_{field['num_shards']:03d}.bin"), 'wb')
+            field['num_shards'] += 1
+            field['shard_bytes'] = 0
+        field['shard'].append(field['num_shards'] - 1)
+        field['offset'].append(field['shard_bytes'] // value.itemsize)
+        field['shape'].append(value.shape)
+        field['file'].write(np.ascontiguousarray(value).tobytes())
+        field['shard_bytes'] += value.nbytes
+
+    def add(self, key, **fields):
+        """Append the arrays of an item. All the items must have the same fields."""
+        assert not self.keys or set(fields) == set(self.fields), " [!] All the items must have the same fields."
+        self.keys.append(key)
+        for name, value in fields.items():
+            self._write(name, np.asarray(value))
+
+    def close(self, **meta):
+        """Write the index with the given ``meta`` data."""
+        index = {'keys': np.array(self.keys)}
+        for name, field in self.fields.items():
+            if field['file'] is not None:
+                field['file'].close()
+            index[name + '_shard'] = np.array(field['shard'], dtype=np.int32)
+            index[name + '_offset'] = np.array(field['offset'], dtype=np.int64)
+            index[name + '_shape'] = np.array(field['shape'], dtype=np.int64).reshape(len(self.keys), field['ndim'])
+        np.savez(os.path.join(self.path, 'index.npz'), **index)
+        meta['fields'] = {name: {'dtype': field['dtype'], 'num_shards': field['num_shards']}
+                          for name, field in self.fields.items()}
+        with open(os.path.join(self.path, 'index.json'), 'w') as f:
+            json.dump(meta, f, indent=4)
+
+
+class FeatureStore(object):
+    def __init__(self, path):
+        """Read items of a feature store written by ``build_feature_store()``.
+
+        Shards are memory-mapped on first use in each process and ``get()``
+        returns views into them, so reading an item does not copy or decode it.
+
+        Args:
+            path (str): feature store folder.
+        """
+        self.path = path
+        with open(os.path.join(path, 'index.json'), 'r') as f:
+            self.meta = json.load(f)
+        index = np.load(os.path.join(path, 'index.npz'))
+        self.keys = index['keys'].tolist()
+        self._key_to_idx = {key: idx for idx, key in enumerate(self.keys)}
+        self.fields = {}
+        for name, field in self.meta['fields'].items():
+            self.fields[name] = {'dtype': np.dtype(field['dtype']), 'shard': index[name + '_shard'],
+                                 'offset': index[name + '_offset'], 'shape': index[name + '_shape']}
+        self._shards = {}
+
+    def __len__(self):
+        return len(self.keys)
+
+    def __contains__(self, key):
+        return key in self._key_to_idx
+
+    def index(self, key):
+        try:
+            return self._key_to_idx[key]
+        except KeyError:
+            raise KeyError(f" [!] {key} is not in the feature store {self.path}.")
+
+    def _shard(self, name, shard):
+        if (name, shard) not in self._shards:
+            self._shards[(name, shard)] = np.memmap(os.path.join(self.path, f"{name}_{shard:03d}.bin"),
+                                                    dtype=self.fields[name]['dtype'], mode='r')
+        return self._shards[(name, shard)]
+
+    def get(self, name, idx):
+        """Return the ``name`` array of the item ``idx`` as a read-only view."""
+        field = self.fields[name]
+        shape = tuple(field['shape'][idx])
+        size = int(np.prod(shape))
+        if size == 0:
+            return np.empty(shape, dtype=field['dtype'])
+        offset = field['offset'][idx]
+        return np.asarray(self._shard(name, field['shard'][idx])[offset:offset + size]).reshape(shape)
+
+    def shapes(self, name):
+        """[N, ndim] shapes of the ``name`` arrays of all the items."""
+        return self.fields[name]['shape']
+
+    def check_params(self, dataset):
+        """Check that ``dataset`` computes the same features as the stored ones."""
+        for key, value in self.meta['audio'].items():
+            assert value == dataset.ap.__dict__[key], \
+                f" [!] Audio param {key} does not match the feature store. {value} vs {dataset.ap.__dict__[key]}"
+        for key, value in self.meta['text'].items():
+            assert value == getattr(dataset, key), \
+                f" [!] Text param {key} does not match the feature store. {value} vs {getattr(dataset, key)}"
+        if dataset.compute_linear_spec:
+            assert 'linear' in self.fields, " [!] The feature store has no linear spectrograms."
+        if any(len(item) == 4 for item in dataset.items):
+            assert 'attn' in self.fields, \
+                " [!] The feature store has no attention masks. Build it with 'meta_file_attn_mask' in the datasets."
+
+
+class _FeatureDataset(Dataset):
+    def __init__(self, dataset):
+        self.dataset = dataset
+
+    def __len__(self):
+        return len(self.dataset)
+
+    def __getitem__(self, idx):
+        return self.dataset.compute_features(idx)
+
+
+def _identity(x):
+    return x
+
+
+def build_feature_store(dataset, path, num_workers=0, shard_size=2**30):
+    """Compute the features of all the items of a ``MyDataset`` and save them
+    to a feature store at ``path``.
+
+    Stored token sequences are without BOS and EOS, which are added when the
+    dataset reads them. The dataset must have ``enable_eos_bos`` and
+    ``use_noise_augment`` disabled.
+
+    Args:
+        dataset (MyDataset): dataset of the items to store.
+        path (str): output folder.
+        num_workers (int, optional): number of processes computing features. Defaults to 0.
+        shard_size (int, optional): max size of a shard file in bytes. Defaults to 1GB.
+    """
+    assert not dataset.enable_eos_bos and not dataset.use_noise_augment
+    writer = FeatureStoreWriter(path, shard_size)
+    loader = DataLoader(_FeatureDataset(dataset), batch_size=None, shuffle=False, num_workers=num_workers,
+                        collate_fn=_identity)
+    for idx, features in enumerate(tqdm.tqdm(loader, total=len(dataset))):
+        writer.add(dataset.items[idx][1], **features)
+    writer.close(audio={key: dataset.ap.__dict__[key] for key in _AUDIO_PARAMS},
+                 text={key: getattr(dataset, key) for key in _TEXT_PARAMS})
@@ -0,0 +1,105 @@
+import hashlib
+import json
+import os
+import struct
+
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows, appends are not locked
+    fcntl = None
+
+# record header: sha1 of the key and number of int32 tokens that follow
+_HEADER = struct.Struct('<20sI')
+
+
+def _lock(f, exclusive):
+    if fcntl is not None:
+        fcntl.flock(f.fileno(), fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+
+
+class PhonemeSequenceCache(object):
+    def __init__(self, path):
+        """Token sequences of phonemized texts in a single append-only file.
+
+        The file is a list of records, each a 20 byte key hash and a token count
+        followed by the int32 tokens. It is read in one go when the cache is
+        created and kept in memory, so looking up a sequence does not touch the
+        file system.
+
+        Several processes, e.g. data loader workers or distributed trainers,
+        can append to the same file. Appends hold an exclusive lock, read the
+        records written by others since their last read and cut any record left
+        incomplete by a killed process before writing.
+
+        Args:
+            path (str): cache file path.
+        """
+        self.path = path
+        self._index = {}
+        self._end = 0
+        self.load()
+
+    @staticmethod
+    def make_key(text, cleaners, language, add_blank, tp=None):
+        """Hash of everything the token sequence of ``text`` depends on."""
+        content = json.dumps([text, cleaners, language, add_blank, tp], ensure_ascii=False, sort_keys=True)
+        return hashlib.sha1(content.encode('utf-8')).digest()
+
+    def __len__(self):
+        return len(self._index)
+
+    def __contains__(self, key):
+        return key in self._index
+
+    def _read_records(self, data, start):
+        """Index the complete records of ``data`` read at file offset ``start``.
+        Return the file offset after the last complete record."""
+        offset = 0
+        while offset + _HEADER.size <= len(data):
+            key, length = _HEADER.unpack_from(data, offset)
+            end = offset + _HEADER.size + 4 * length
+            if end > len(data):
+                break
+            self._index[key] = np.frombuffer(data, dtype='<i4', count=length, offset=offset + _HEADER.size)
+            offset = end
+        return start + offset
+
+    def load(self):
+        """(Re)read the whole cache file."""
+        self._index = {}
+        self._end = 0
+        if os.path.exists(self.path):
+            with open(self.path, 'rb') as f:
+                _lock(f, exclusive=False)
+                self._end = self._read_records(f.read(), 0)
+
+    def get(self, key):
+        """Return the read-only token sequence of a key or None."""
+        return self._index.get(key)
+
+    def add(self, sequences):
+        """Append ``(key, tokens)`` pairs to the cache file in a single write."""
+        records = []
+        for key, tokens in sequences:
+            tokens = np.asarray(tokens, dtype='<i4')
+            records.append(_HEADER.pack(key, len(tokens)) + tokens.tobytes())
+        data = b''.join(records)
+        if not data:
+            return
+        with open(self.path, 'a+b') as f:
+            _lock(f, exclusive=True)
+            size = os.fstat(f.fileno()).st_size
+            if size != self._end:
+                # records of other processes, followed by an incomplete one if a writer was killed
+                start = self._end if size > self._end else 0
+                f.seek(start)
+                end = self._read_records(f.read(size - start), start)
+                if end < size:
+                    f.truncate(end)
+                self._end = end
+            f.write(data)
+            f.flush()
+        self._read_records(data, self._end)
+        self._end += len(data)
@@ -2,50 +2,120 @@ import os
 from glob import glob
 import re
 import sys
+from multiprocessing import Pool
 from pathlib import Path
 
 from tqdm import tqdm
 
+from TTS.tts.datasets.dataset_index import EVAL, TRAIN, DatasetIndex, dataset_index_key, file_stats
 from TTS.tts.utils.generic_utils import split_dataset
 
 ####################
 # UTILITIES
 ####################
 
-def load_meta_data(datasets, eval_split=True):
+def load_meta_data(datasets, eval_split=True, cache_path=None, num_workers=0, return_durations=False):
+    """Load the items of all the datasets of a config.
+
+    Args:
+        datasets (List[Dict]): dataset configs.
+        eval_split (bool, optional): return eval items too. Defaults to True.
+        cache_path (str, optional): folder of the dataset index files. If None, the datasets are not cached.
+        num_workers (int, optional): number of processes loading uncached datasets. Defaults to 0.
+        return_durations (bool, optional): also return a dict of the audio file durations in seconds,
+            -1 for unreadable files. Defaults to False.
+    """
     meta_data_train_all = []
     meta_data_eval_all = [] if eval_split else None
-    for dataset in datasets:
-        name = dataset['name']
-        root_path = dataset['path']
-        meta_file_train = dataset['meta_file_train']
-        meta_file_val = dataset['meta_file_val']
-        # setup the right data processor
-        preprocessor = get_preprocessor_by_name(name)
-        # load train set
-        meta_data_train = preprocessor(root_path, meta_file_train)
-        print(f" | > Found {len(meta_data_train)} files in {Path(root_path).resolve()}")
+    durations = {}
+    # audio headers are only read if the durations are needed
+    indices = load_dataset_indices(datasets, cache_path, num_workers, read_stats=return_durations)
+    for dataset, index in zip(datasets, indices):
+        if return_durations:
+            durations.update(zip([item[1] for item in index.items], index.durations.tolist()))
+        meta_data_train = index.split(TRAIN)
+        print(f" | > Found {len(meta_data_train)} files in {Path(dataset['path']).resolve()}")
         # load evaluation split if set
         if eval_split:
-            if meta_file_val is None:
+            if dataset['meta_file_val'] is None:
                 meta_data_eval, meta_data_train = split_dataset(meta_data_train)
             else:
-                meta_data_eval = preprocessor(root_path, meta_file_val)
+                meta_data_eval = index.split(EVAL)
             meta_data_eval_all += meta_data_eval
         meta_data_train_all += meta_data_train
-        # load attention masks for duration predictor training
-        if 'meta_file_attn_mask' in dataset:
-            meta_data = dict(load_attention_mask_meta_data(dataset['meta_file_attn_mask']))
-            for idx, ins in enumerate(meta_data_train_all):
-                attn_file = meta_data[ins[1]].strip()
-                meta_data_train_all[idx].append(attn_file)
-            if meta_data_eval_all is not None:
-                for idx, ins in enumerate(meta_data_eval_all):
-                    attn_file = meta_data[ins[1]].strip()
-                    meta_data_eval_all[idx].append(attn_file)
+    if return_durations:
+        return meta_data_train_all, meta_data_eval_all, durations
     return meta_data_train_all, meta_data_eval_all
 
 
+def _run_preprocessor(name, root_path, meta_file):
+    return get_preprocessor_by_name(name)(root_path, meta_file)
+
+
+def load_dataset_indices(datasets, cache_path=None, num_workers=0, read_stats=True):
+    """Return a ``DatasetIndex`` for each dataset config.
+
+    An index is read from ``cache_path`` if the dataset config and the
+    modification times of its files match. Otherwise the preprocessors and the
+    audio file header reads run in a pool of ``num_workers`` processes, and each
+    new index is saved as soon as it is complete, so a failed or interrupted run
+    keeps the datasets already indexed.
+
+    The audio file headers are not read if ``read_stats`` is False and
+    ``cache_path`` is None. File sizes and durations of those indices are -1.
+    """
+    indices = [None] * len(datasets)
+    index_paths = [None] * len(datasets)
+    if cache_path is not None:
+        os.makedirs(cache_path, exist_ok=True)
+        for idx, dataset in enumerate(datasets):
+            index_paths[idx] = os.path.join(cache_path, f"{dataset['name']}_{dataset_index_key(dataset)}.npz")
+            if os.path.exists(index_paths[idx]):
+                indices[idx] = DatasetIndex.load(index_paths[idx])
+                print(f" | > Loaded the index of {dataset['path']} from {index_paths[idx]}")
+    missing = [idx for idx, index in enumerate(indices) if index is None]
+    if not missing:
+        return indices
+    pool = Pool(num_workers) if num_workers > 1 else None
+    try:
+        # start all the preprocessors at once
+        tasks = {}
+        for idx in missing:
+            dataset = datasets[idx]
+            for split, meta_file in [(TRAIN, dataset['meta_file_train']), (EVAL, dataset['meta_file_val'])]:
+                if split == EVAL and meta_file is None:
+                    continue
+                args = (dataset['name'], dataset['path'], meta_file)
+                tasks[(idx, split)] = pool.apply_async(_run_preprocessor, args) if pool is not None else args
+        for idx in missing:
+            dataset = datasets[idx]
+            items, splits = [], []
+            for split in [TRAIN, EVAL]:
+                if (idx, split) in tasks:
+                    task = tasks[(idx, split)]
+                    split_items = task.get() if pool is not None else _run_preprocessor(*task)
+                    items += split_items
+                    splits += [split] * len(split_items)
+            # load attention masks for duration predictor training
+            if 'meta_file_attn_mask' in dataset:
+                attn_files = dict(load_attention_mask_meta_data(dataset['meta_file_attn_mask']))
+                for item in items:
+                    item.append(attn_files[item[1]].strip())
+            if read_stats or index_paths[idx] is not None:
+                wav_files = [item[1] for item in items]
+                stats = pool.map(file_stats, wav_files, 256) if pool is not None else list(map(file_stats, wav_files))
+                file_sizes, durations = zip(*stats) if stats else ([], [])
+            else:
+                file_sizes, durations = [-1] * len(items), [-1.0] * len(items)
+            indices[idx] = DatasetIndex(items, splits, file_sizes, durations)
+            if index_paths[idx] is not None:
+                indices[idx].save(index_paths[idx])
+    finally:
+        if pool is not None:
+            pool.terminate()
+    return indices
+
+
 def load_attention_mask_meta_data(metafile_path):
     """Load meta data file created by compute_attention_masks.py"""
     with open(metafile_path, 'r') as f:
@@ -0,0 +1,98 @@
+import math
+
+import numpy as np
+from torch.utils.data.sampler import Sampler
+
+
+class BucketBatchSampler(Sampler):
+    def __init__(self, lengths, max_frames, max_batch_size=None, bucket_size=None, shuffle=True,
+                 num_replicas=1, rank=0, seed=0):
+        """Batch items of similar length under a budget of padded frames.
+
+        Items are sorted by length, shuffled within buckets of ``bucket_size``
+        neighbours, and split into batches of at most ``max_frames`` padded
+        frames, i.e. ``batch_size * max(lengths)`` in the batch. Batches are
+        shuffled every epoch. With several replicas, every replica builds the same
+        batches and takes every ``num_replicas``-th one, repeating the first
+        batches to make their number evenly divisible as
+        ``TTS.utils.distribute.DistributedSampler`` does.
+
+        Args:
+            lengths (List[int]): length of each item, e.g. number of mel frames.
+            max_frames (int): max number of padded frames of a batch. Longer items get a batch of their own.
+            max_batch_size (int, optional): max number of items of a batch. Defaults to None.
+            bucket_size (int, optional): number of items of similar length shuffled together. Defaults to 1% of the items.
+            shuffle (bool, optional): shuffle buckets and batches every epoch. Defaults to True.
+            num_replicas (int, optional): number of distributed processes. Defaults to 1.
+            rank (int, optional): rank of the current process. Defaults to 0.
+            seed (int, optional): random seed, shared by all the replicas. Defaults to 0.
+        """
+        super().__init__(None)
+        self.lengths = np.asarray(lengths)
+        self.max_frames = max_frames
+        self.max_batch_size = max_batch_size
+        self.bucket_size = bucket_size or max(1, len(self.lengths) // 100)
+        self.shuffle = shuffle
+        self.num_replicas = num_replicas
+        self.rank = rank
+        self.seed = seed
+        self.epoch = 0
+        # batches are deterministic without shuffling
+        self._batches = None if shuffle else self._make_batches(np.random.RandomState(seed))
+
+    def set_epoch(self, epoch):
+        self.epoch = epoch
+
+    def _make_batches(self, rng):
+        order = np.argsort(self.lengths, kind='stable')
+        if self.shuffle:
+            for offset in range(0, len(order), self.bucket_size):
+                rng.shuffle(order[offset:offset + self.bucket_size])
+        batches = []
+        start = 0
+        batch_max = 0
+        for pos, length in enumerate(self.lengths[order].tolist()):
+            num_items = pos - start + 1
+            too_long = num_items * max(batch_max, length) > self.max_frames
+            too_many = self.max_batch_size is not None and num_items > self.max_batch_size
+            if num_items > 1 and (too_long or too_many):
+                batches.append(order[start:pos].tolist())
+                start = pos
+                batch_max = 0
+            batch_max = max(batch_max, length)
+        if start < len(order):
+            batches.append(order[start:].tolist())
+        if self.shuffle:
+            rng.shuffle(batches)
+        return batches
+
+    def batches(self):
+        """Batches of all the replicas for the current epoch."""
+        if self._batches is not None:
+            return self._batches
+        return self._make_batches(np.random.RandomState(self.seed + self.epoch))
+
+    def __iter__(self):
+        batches = self.batches()
+        if not batches:
+            return iter([])
+        num_batches = int(math.ceil(len(batches) / self.num_replicas))
+        total_size = num_batches * self.num_replicas
+        batches = (batches * math.ceil(total_size / len(batches)))[:total_size]
+        batches = batches[self.rank:total_size:self.num_replicas]
+        # new batches next epoch if set_epoch() is not called
+        self.epoch += 1
+        return iter(batches)
+
+    def __len__(self):
+        if self._batches is not None:
+            num_batches = len(self._batches)
+        else:
+            # the number of batches may change slightly across epochs
+            num_batches = len(self._make_batches(np.random.RandomState(self.seed + self.epoch)))
+        return int(math.ceil(num_batches / self.num_replicas))
+
+
+def padding_ratio(lengths, padded_length):
+    """Fraction of padded frames in a batch of ``lengths`` padded to ``padded_length``."""
+    return 1 - float(lengths.sum()) / (len(lengths) * padded_length)
@@ -177,9 +177,20 @@ class CBHG(nn.Module):
                           batch_first=True,
                           bidirectional=True)
 
-    def forward(self, inputs):
+    def forward(self, inputs, mask=None):
+        """
+        Args:
+            inputs: (B, in_features, T_in)
+            mask: (B, T_in) valid frames of zero padded inputs. Padded frames are
+                zeroed before each convolution and skipped by the GRU, so they do not
+                change the outputs of the valid frames.
+        """
         # (B, in_features, T_in)
         x = inputs
+        if mask is not None:
+            lengths = mask.sum(1)
+            mask = mask.unsqueeze(1).to(inputs.dtype)
+            x = x * mask
         # (B, hid_features*K, T_in)
         # Concat conv1d bank outputs
         outs = []
@@ -189,6 +200,8 @@ class CBHG(nn.Module):
         x = torch.cat(outs, dim=1)
         assert x.size(1) == self.conv_bank_features * len(self.conv1d_banks)
         for conv1d in self.conv1d_projections:
+            if mask is not None:
+                x = x * mask
             x = conv1d(x)
         x += inputs
         x = x.transpose(1, 2)
@@ -202,7 +215,12 @@ class CBHG(nn.Module):
         # (B, T_in, hid_features*2)
         # TODO: replace GRU with convolution as in Deep Voice 3
         self.gru.flatten_parameters()
+        if mask is None:
+            outputs, _ = self.gru(x)
+            return outputs
+        x = nn.utils.rnn.pack_padded_sequence(x, lengths.cpu(), batch_first=True, enforce_sorted=False)
         outputs, _ = self.gru(x)
+        outputs, _ = nn.utils.rnn.pad_packed_sequence(outputs, batch_first=True, total_length=inputs.size(2))
         return outputs
 
 
@@ -220,8 +238,8 @@ class EncoderCBHG(nn.Module):
             gru_features=128,
             num_highways=4)
 
-    def forward(self, x):
-        return self.cbhg(x)
+    def forward(self, x, mask=None):
+        return self.cbhg(x, mask)
 
 
 class Encoder(nn.Module):
@@ -239,10 +257,10 @@ class Encoder(nn.Module):
         self.prenet = Prenet(in_features, out_features=[256, 128])
         self.cbhg = EncoderCBHG()
 
-    def forward(self, inputs):
+    def forward(self, inputs, mask=None):
         # B x T x prenet_dim
         outputs = self.prenet(inputs)
-        outputs = self.cbhg(outputs.transpose(1, 2))
+        outputs = self.cbhg(outputs.transpose(1, 2), mask)
         return outputs
 
 
@@ -258,8 +276,8 @@ class PostCBHG(nn.Module):
             gru_features=128,
             num_highways=4)
 
-    def forward(self, x):
-        return self.cbhg(x)
+    def forward(self, x, mask=None):
+        return self.cbhg(x, mask)
 
 
 class Decoder(nn.Module):
@@ -495,6 +513,54 @@ class Decoder(nn.Module):
                 break
         return self._parse_outputs(outputs, attentions, stop_tokens)
 
+    def inference_batch(self, inputs, mask):
+        """Decoder inference for a zero padded batch. Each sample keeps its own
+        finished flag and decoding ends when all samples are finished or
+        ``max_decoder_steps`` is reached.
+        Args:
+            inputs: encoder outputs.
+            mask: attention mask for sequence padding.
+        Shapes:
+            - inputs: batch x time x encoder_out_dim
+            - mask: batch x time
+            - output_lengths: batch
+        """
+        outputs = []
+        attentions = []
+        stop_tokens = []
+        t = 0
+        self._init_states(inputs)
+        self.attention.init_win_idx()
+        self.attention.init_states(inputs)
+        input_lengths = mask.sum(1)
+        batch_idxs = torch.arange(inputs.shape[0], device=inputs.device)
+        finished = torch.zeros(inputs.shape[0], dtype=torch.bool, device=inputs.device)
+        output_lengths = torch.zeros(inputs.shape[0], dtype=torch.long, device=inputs.device)
+        while True:
+            if t > 0:
+                new_memory = outputs[-1]
+                self._update_memory_input(new_memory)
+            output, stop_token, attention = self.decode(inputs, mask)
+            stop_token = torch.sigmoid(stop_token.data)
+            outputs += [output]
+            attentions += [attention]
+            stop_tokens += [stop_token]
+            t += 1
+            # attention weight on the last valid input of each sample
+            last_attention = attention[batch_idxs, input_lengths - 1]
+            stopped = (t > input_lengths.float() / 4) & ((stop_token.squeeze(1) > 0.6)
+                                                         | (last_attention > 0.6)) & ~finished
+            output_lengths[stopped] = t * self.r
+            finished |= stopped
+            if finished.all():
+                break
+            if t > self.max_decoder_steps:
+                print("   | > Decoder stopped with 'max_decoder_steps")
+                output_lengths[~finished] = t * self.r
+                break
+        outputs, attentions, stop_tokens = self._parse_outputs(outputs, attentions, stop_tokens)
+        return outputs, attentions, stop_tokens, output_lengths
+
 
 class StopNet(nn.Module):
     r"""Stopnet signalling decoder to stop inference.
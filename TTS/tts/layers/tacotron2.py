@@ -66,9 +66,13 @@ class Postnet(nn.Module):
         self.convolutions.append(
             ConvBNBlock(512, in_out_channels, kernel_size=5, activation=None))
 
-    def forward(self, x):
+    def forward(self, x, mask=None):
+        """Zero the padded frames of ``x`` before each convolution if the
+        (B, T) ``mask`` of valid frames is given."""
         o = x
         for layer in self.convolutions:
+            if mask is not None:
+                o = o * mask.unsqueeze(1).to(o.dtype)
             o = layer(o)
         return o
 
@@ -119,6 +123,20 @@ class Encoder(nn.Module):
         o, _ = self.lstm(o)
         return o
 
+    def inference_batch(self, x, input_lengths):
+        """Inference for zero padded inputs in any order. Padded frames are zeroed
+        before each convolution so that they do not change the valid frames."""
+        mask = (torch.arange(x.size(2), device=x.device)[None] < input_lengths[:, None]).unsqueeze(1).to(x.dtype)
+        o = x
+        for layer in self.convolutions:
+            o = layer(o * mask)
+        o = o.transpose(1, 2)
+        o = nn.utils.rnn.pack_padded_sequence(o, input_lengths.cpu(), batch_first=True, enforce_sorted=False)
+        self.lstm.flatten_parameters()
+        o, _ = self.lstm(o)
+        o, _ = nn.utils.rnn.pad_packed_sequence(o, batch_first=True, total_length=x.size(2))
+        return o
+
 
 # adapted from https://github.com/NVIDIA/tacotron2/
 class Decoder(nn.Module):
@@ -374,6 +392,58 @@ class Decoder(nn.Module):
 
         return outputs, alignments, stop_tokens
 
+    def inference_batch(self, inputs, mask):
+        r"""Decoder inference for a zero padded batch. Each sample keeps its own
+        finished flag set by its stop token, and decoding ends when all samples
+        are finished or ``max_decoder_steps`` is reached.
+        Args:
+            inputs: Encoder outputs.
+            mask: Attention mask for sequence padding.
+
+        Shapes:
+            - inputs: (B, T, D_out_enc)
+            - mask: (B, T)
+            - outputs: (B, T_mel, D_mel)
+            - alignments: (B, T_in, T_out)
+            - stop_tokens: (B, T_out)
+            - output_lengths: (B)
+        """
+        memory = self.get_go_frame(inputs)
+        memory = self._update_memory(memory)
+
+        self._init_states(inputs, mask=mask)
+        self.attention.init_states(inputs)
+
+        finished = torch.zeros(inputs.shape[0], dtype=torch.bool, device=inputs.device)
+        output_lengths = torch.zeros(inputs.shape[0], dtype=torch.long, device=inputs.device)
+        outputs, stop_tokens, alignments, t = [], [], [], 0
+        while True:
+            memory = self.prenet(memory)
+            decoder_output, alignment, stop_token = self.decode(memory)
+            stop_token = torch.sigmoid(stop_token.data)
+            outputs += [decoder_output.squeeze(1)]
+            stop_tokens += [stop_token]
+            alignments += [alignment]
+
+            if t > 0:
+                stopped = (stop_token.squeeze(1) > self.stop_threshold) & ~finished
+                output_lengths[stopped] = len(outputs) * self.r
+                finished |= stopped
+            if finished.all():
+                break
+            if len(outputs) == self.max_decoder_steps:
+                print("   | > Decoder stopped with 'max_decoder_steps")
+                output_lengths[~finished] = len(outputs) * self.r
+                break
+
+            memory = self._update_memory(decoder_output)
+            t += 1
+
+        outputs, stop_tokens, alignments = self._parse_outputs(
+            outputs, stop_tokens, alignments)
+
+        return outputs, alignments, stop_tokens, output_lengths
+
     def inference_truncated(self, inputs):
         """
         Preserve decoder states for continuous inference
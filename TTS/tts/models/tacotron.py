@@ -211,3 +211,38 @@ class Tacotron(TacotronAbstract):
         postnet_outputs = self.last_linear(postnet_outputs)
         decoder_outputs = decoder_outputs.transpose(1, 2)
         return decoder_outputs, postnet_outputs, alignments, stop_tokens
+
+    @torch.no_grad()
+    def inference_batch(self, characters, text_lengths, speaker_ids=None, speaker_embeddings=None):
+        """
+        Inference for a zero padded batch of input sequences. The outputs of
+        each sequence match those of ``inference()`` on the unpadded sequence.
+
+        Shapes:
+            characters: [B, T_in]
+            text_lengths: [B]
+            output_lengths: [B]
+        """
+        input_mask, _ = self.compute_masks(text_lengths, None)
+        inputs = self.embedding(characters)
+        # padding does not leak into the valid frames of shorter samples
+        encoder_outputs = self.encoder(inputs, input_mask)
+        encoder_outputs = encoder_outputs * input_mask.unsqueeze(2).expand_as(encoder_outputs)
+        if self.num_speakers > 1:
+            if not self.embeddings_per_sample:
+                # B x 1 x speaker_embed_dim
+                speaker_embeddings = self.speaker_embedding(speaker_ids)[:, None]
+            else:
+                # B x 1 x speaker_embed_dim
+                speaker_embeddings = torch.unsqueeze(speaker_embeddings, 1)
+            encoder_outputs = self._concat_speaker_embedding(encoder_outputs, speaker_embeddings)
+        decoder_outputs, alignments, stop_tokens, output_lengths = self.decoder.inference_batch(
+            encoder_outputs, input_mask)
+        # mask the frames decoded after each sample had stopped
+        _, output_mask = self.compute_masks(text_lengths, output_lengths)
+        decoder_outputs = decoder_outputs * output_mask.unsqueeze(1).expand_as(decoder_outputs)
+        postnet_outputs = self.postnet(decoder_outputs, output_mask)
+        postnet_outputs = self.last_linear(postnet_outputs)
+        postnet_outputs = postnet_outputs * output_mask.unsqueeze(2).expand_as(postnet_outputs)
+        decoder_outputs = decoder_outputs.transpose(1, 2)
+        return decoder_outputs, postnet_outputs, alignments, stop_tokens, output_lengths
@@ -208,6 +208,45 @@ class Tacotron2(TacotronAbstract):
             decoder_outputs, postnet_outputs, alignments)
         return decoder_outputs, postnet_outputs, alignments, stop_tokens
 
+    @torch.no_grad()
+    def inference_batch(self, text, text_lengths, speaker_ids=None, speaker_embeddings=None):
+        """
+        Inference for a zero padded batch of input sequences. The outputs of
+        each sequence match those of ``inference()`` on the unpadded sequence.
+
+        Shapes:
+            text: [B, T_in]
+            text_lengths: [B]
+            output_lengths: [B]
+        """
+        input_mask, _ = self.compute_masks(text_lengths, None)
+        embedded_inputs = self.embedding(text).transpose(1, 2)
+        # padding does not leak into the valid frames of shorter samples
+        encoder_outputs = self.encoder.inference_batch(embedded_inputs, text_lengths)
+
+        if self.num_speakers > 1:
+            if not self.embeddings_per_sample:
+                # B x 1 x speaker_embed_dim
+                speaker_embeddings = self.speaker_embedding(speaker_ids)[:, None]
+            else:
+                # B x 1 x speaker_embed_dim
+                speaker_embeddings = torch.unsqueeze(speaker_embeddings, 1)
+            encoder_outputs = self._concat_speaker_embedding(encoder_outputs, speaker_embeddings)
+
+        encoder_outputs = encoder_outputs * input_mask.unsqueeze(2).expand_as(encoder_outputs)
+
+        decoder_outputs, alignments, stop_tokens, output_lengths = self.decoder.inference_batch(
+            encoder_outputs, input_mask)
+        # mask the frames decoded after each sample had stopped
+        _, output_mask = self.compute_masks(text_lengths, output_lengths)
+        decoder_outputs = decoder_outputs * output_mask.unsqueeze(1).expand_as(decoder_outputs)
+        postnet_outputs = self.postnet(decoder_outputs, output_mask)
+        postnet_outputs = decoder_outputs + postnet_outputs
+        postnet_outputs = postnet_outputs * output_mask.unsqueeze(1).expand_as(postnet_outputs)
+        decoder_outputs, postnet_outputs, alignments = self.shape_outputs(
+            decoder_outputs, postnet_outputs, alignments)
+        return decoder_outputs, postnet_outputs, alignments, stop_tokens, output_lengths
+
     def inference_truncated(self, text, speaker_ids=None, style_mel=None, speaker_embeddings=None):
         """
         Preserve model states for continuous inference
@@ -4,7 +4,8 @@ if 'tensorflow' in installed or 'tensorflow-gpu' in installed:
     import tensorflow as tf
 import torch
 import numpy as np
-from .text import text_to_sequence, phoneme_to_sequence
+from .data import prepare_data
+from .text import text_to_sequence, phoneme_to_sequence, phoneme_to_sequence_batch
 
 
 def text_to_seqvec(text, CONFIG):
@@ -24,6 +25,17 @@ def text_to_seqvec(text, CONFIG):
     return seq
 
 
+def text_to_seqvec_batch(texts, CONFIG):
+    """Convert a list of texts to sequence vectors, phonemizing them in a single call."""
+    if not CONFIG.use_phonemes:
+        return [text_to_seqvec(text, CONFIG) for text in texts]
+    seqs = phoneme_to_sequence_batch(texts, [CONFIG.text_cleaner], CONFIG.phoneme_language,
+                                     CONFIG.enable_eos_bos_chars,
+                                     tp=CONFIG.characters if 'characters' in CONFIG.keys() else None,
+                                     add_blank=CONFIG['add_blank'] if 'add_blank' in CONFIG.keys() else False)
+    return [np.asarray(seq, dtype=np.int32) for seq in seqs]
+
+
 def numpy_to_torch(np_array, dtype, cuda=False):
     if np_array is None:
         return None
@@ -85,6 +97,36 @@ def run_model_torch(model, inputs, CONFIG, truncated, speaker_id=None, style_mel
     return decoder_output, postnet_output, alignments, stop_tokens
 
 
+def run_model_torch_batch(model, inputs, input_lengths, CONFIG, speaker_id=None, speaker_embeddings=None):
+    """Run a zero padded batch of input sequences through a parallel model.
+
+    Args:
+        model (TTS.tts.models): tts model.
+        inputs (Tensor): [B, T_max] padded input sequences sorted by length in descending order.
+        input_lengths (Tensor): [B] lengths of the input sequences.
+
+    Returns:
+        postnet_output (Tensor): [B, T_out_max, C] model outputs.
+        output_lengths (Tensor): [B] number of valid output frames per sample.
+    """
+    g = speaker_id if speaker_id is not None else speaker_embeddings
+    _model = model.module if hasattr(model, 'module') else model
+    if 'tacotron' in CONFIG.model.lower():
+        _, postnet_output, _, _, output_lengths = _model.inference_batch(
+            inputs, input_lengths, speaker_ids=speaker_id, speaker_embeddings=speaker_embeddings)
+        return postnet_output, output_lengths
+    if 'glow' in CONFIG.model.lower():
+        postnet_output, _, _, _, alignments, _, _ = _model.inference(inputs, input_lengths, g=g)
+    elif 'speedy_speech' in CONFIG.model.lower():
+        postnet_output, alignments = _model.inference(inputs, input_lengths, g=g)
+    else:
+        raise NotImplementedError(f' [!] Batched inference is not implemented for {CONFIG.model}')
+    postnet_output = postnet_output.permute(0, 2, 1)
+    # alignments: [B, T_out, T_in]. padded output frames are not aligned to any input.
+    output_lengths = (alignments.sum(2) > 0).sum(1)
+    return postnet_output, output_lengths
+
+
 def run_model_tf(model, inputs, CONFIG, truncated, speaker_id=None, style_mel=None):
     if CONFIG.use_gst and style_mel is not None:
         raise NotImplementedError(' [!] GST inference not implemented for TF')
@@ -176,22 +218,75 @@ def embedding_to_torch(speaker_embedding, cuda=False):
     return speaker_embedding
 
 
-# TODO: perform GL with pytorch for batching
 def apply_griffin_lim(inputs, input_lens, CONFIG, ap):
-    '''Apply griffin-lim to each sample iterating throught the first dimension.
+    '''Apply griffin-lim to a batch of samples. With the torch stft backend the
+    whole batch is processed at once, otherwise each sample is processed separately.
     Args:
         inputs (Tensor or np.Array): Features to be converted by GL. First dimension is the batch size.
         input_lens (Tensor or np.Array): 1D array of sample lengths.
         CONFIG (Dict): TTS config.
         ap (AudioProcessor): TTS audio processor.
     '''
-    wavs = []
-    for idx, spec in enumerate(inputs):
-        wav_len = (input_lens[idx] * ap.hop_length) - ap.hop_length  # inverse librosa padding
-        wav = inv_spectrogram(spec, ap, CONFIG)
-        # assert len(wav) == wav_len, f" [!] wav lenght: {len(wav)} vs expected: {wav_len}"
-        wavs.append(wav[:wav_len])
-    return wavs
+    if ap.stft_backend == 'torch':
+        specs = torch.as_tensor(np.asarray(inputs), dtype=torch.float32).transpose(1, 2)
+        if CONFIG.model.lower() in ["tacotron"]:
+            wavs = ap.inv_spectrogram_batch(specs, input_lens)
+        else:
+            wavs = ap.inv_melspectrogram_batch(specs, input_lens)
+    else:
+        wavs = [inv_spectrogram(spec, ap, CONFIG) for spec in inputs]
+    # inverse librosa padding
+    return [wav[:(input_lens[idx] * ap.hop_length) - ap.hop_length] for idx, wav in enumerate(wavs)]
+
+
+def synthesis_batch(model,
+                    texts,
+                    CONFIG,
+                    use_cuda,
+                    ap,
+                    speaker_id=None,
+                    speaker_embedding=None):
+    """Synthesize model outputs for a list of sentences as a single padded batch.
+
+        Args:
+            model (TTS.tts.models): model to synthesize.
+            texts (List[str]): target sentences.
+            CONFIG (dict): config dictionary to be loaded from config.json.
+            use_cuda (bool): enable cuda.
+            ap (TTS.tts.utils.audio.AudioProcessor): audio processor to process
+                model outputs.
+            speaker_id (int): id of speaker shared by all the sentences.
+            speaker_embedding (list): speaker embedding shared by all the sentences.
+
+        Returns:
+            List[np.ndarray]: model outputs [T_i, C] per sentence, trimmed to their true lengths.
+    """
+    if 'tacotron' in CONFIG.model.lower() and (CONFIG.use_gst or CONFIG.windowing):
+        # GST and attention windowing only support a single sample, run them sentence by sentence.
+        return [synthesis(model, text, CONFIG, use_cuda, ap, speaker_id,
+                          speaker_embedding=speaker_embedding)[3] for text in texts]
+    # preprocess the given texts
+    seqs = text_to_seqvec_batch(texts, CONFIG)
+    # sort by input length in descending order for packed RNN encoders
+    sorted_idxs = np.argsort([-len(seq) for seq in seqs], kind='stable')
+    seqs = [seqs[idx] for idx in sorted_idxs]
+    input_lengths = np.array([len(seq) for seq in seqs])
+    inputs = numpy_to_torch(prepare_data(seqs), torch.long, cuda=use_cuda)
+    input_lengths = numpy_to_torch(input_lengths, torch.long, cuda=use_cuda)
+    # share speaker conditioning across the batch
+    if speaker_id is not None:
+        speaker_id = id_to_torch(speaker_id, cuda=use_cuda).view(1).repeat(len(texts))
+    if speaker_embedding is not None:
+        speaker_embedding = embedding_to_torch(speaker_embedding, cuda=use_cuda).repeat(len(texts), 1)
+    # synthesize voice
+    postnet_output, output_lengths = run_model_torch_batch(
+        model, inputs, input_lengths, CONFIG, speaker_id, speaker_embeddings=speaker_embedding)
+    postnet_output = postnet_output.data.cpu().numpy()
+    output_lengths = output_lengths.cpu().numpy()
+    outputs = [None] * len(texts)
+    for idx, sorted_idx in enumerate(sorted_idxs):
+        outputs[sorted_idx] = postnet_output[idx, :output_lengths[idx]]
+    return outputs
 
 
 def synthesis(model,
@@ -13,17 +13,31 @@ hyperparameter. Some cleaners are English-specific. You'll typically want to use
 import re
 from unidecode import unidecode
 from .number_norm import normalize_numbers
-from .abbreviations import abbreviations_en, abbreviations_fr
+from .abbreviations import abbreviations_en, abbreviations_en_dict, abbreviations_en_re, abbreviations_fr
 from .time import expand_time_english
 
 # Regular expression matching whitespace:
 _whitespace_re = re.compile(r'\s+')
 
+# Regular expression matching non ASCII characters. Pure ASCII text skips unidecode.
+_non_ascii_re = re.compile(r'[^\x00-\x7f]')
+
+# Regular expression matching digits. Numbers and times are only expanded if it matches.
+_digit_re = re.compile(r'[0-9]')
+
+# replace_symbols() and remove_aux_symbols() for english in a single translate table
+_symbols_en_table = str.maketrans({';': ',', '-': ' ', ':': ',', '&': ' and ',
+                                   '<': None, '>': None, '(': None, ')': None, '[': None, ']': None, '"': None})
+
+
+def _expand_abbreviation_en(m):
+    return abbreviations_en_dict[m.group(1).lower()]
+
 
 def expand_abbreviations(text, lang='en'):
     if lang == 'en':
-        _abbreviations = abbreviations_en
-    elif lang == 'fr':
+        return abbreviations_en_re.sub(_expand_abbreviation_en, text)
+    if lang == 'fr':
         _abbreviations = abbreviations_fr
     for regex, replacement in _abbreviations:
         text = re.sub(regex, replacement, text)
@@ -39,10 +53,12 @@ def lowercase(text):
 
 
 def collapse_whitespace(text):
-    return re.sub(_whitespace_re, ' ', text).strip()
+    return _whitespace_re.sub(' ', text).strip()
 
 
 def convert_to_ascii(text):
+    if not _non_ascii_re.search(text):
+        return text
     return unidecode(text)
 
 
@@ -96,11 +112,11 @@ def english_cleaners(text):
     '''Pipeline for English text, including number and abbreviation expansion.'''
     text = convert_to_ascii(text)
     text = lowercase(text)
-    text = expand_time_english(text)
-    text = expand_numbers(text)
+    if _digit_re.search(text):
+        text = expand_time_english(text)
+        text = expand_numbers(text)
     text = expand_abbreviations(text)
-    text = replace_symbols(text)
-    text = remove_aux_symbols(text)
+    text = text.translate(_symbols_en_table)
     text = collapse_whitespace(text)
     return text
 
@@ -124,10 +140,10 @@ def portuguese_cleaners(text):
 
 def phoneme_cleaners(text):
     '''Pipeline for phonemes mode, including number and abbreviation expansion.'''
-    text = expand_numbers(text)
+    if _digit_re.search(text):
+        text = expand_numbers(text)
     text = convert_to_ascii(text)
     text = expand_abbreviations(text)
-    text = replace_symbols(text)
-    text = remove_aux_symbols(text)
+    text = text.translate(_symbols_en_table)
     text = collapse_whitespace(text)
     return text
@@ -0,0 +1,82 @@
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+
+
+class PhonemeCache(object):
+    def __init__(self, max_size=10000, db_path=None):
+        """In-process LRU cache of phonemized text with an optional SQLite store.
+
+        The SQLite store survives restarts and can be shared by several server
+        workers. Entries missing in memory are looked up in the store before
+        calling the phonemizer.
+
+        Args:
+            max_size (int, optional): max number of entries kept in memory. 0 disables the in-memory cache. Defaults to 10000.
+            db_path (str, optional): path to the SQLite file. Defaults to None.
+        """
+        self.max_size = max_size
+        self.db_path = db_path
+        self.hits = 0
+        self.store_hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._conn_pid = None
+
+    @staticmethod
+    def make_key(text, cleaner_names, language):
+        return json.dumps([text, list(cleaner_names), language], ensure_ascii=False)
+
+    def _connect(self):
+        # connections cannot be shared with forked workers
+        if self._conn is None or self._conn_pid != os.getpid():
+            self._conn = sqlite3.connect(self.db_path, timeout=30, check_same_thread=False)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS phonemes (key TEXT PRIMARY KEY, value TEXT)')
+            self._conn.commit()
+            self._conn_pid = os.getpid()
+        return self._conn
+
+    def get(self, key):
+        """Return the cached phonemes or None."""
+        with self._lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                self.hits += 1
+                return self._cache[key]
+            if self.db_path is not None:
+                row = self._connect().execute('SELECT value FROM phonemes WHERE key = ?', (key, )).fetchone()
+                if row is not None:
+                    self.store_hits += 1
+                    self._set(key, row[0])
+                    return row[0]
+            self.misses += 1
+            return None
+
+    def set(self, key, value):
+        with self._lock:
+            self._set(key, value)
+            if self.db_path is not None:
+                conn = self._connect()
+                conn.execute('INSERT OR IGNORE INTO phonemes (key, value) VALUES (?, ?)', (key, value))
+                conn.commit()
+
+    def _set(self, key, value):
+        if self.max_size <= 0:
+            return
+        self._cache[key] = value
+        self._cache.move_to_end(key)
+        if len(self._cache) > self.max_size:
+            self._cache.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+            self.hits = self.store_hits = self.misses = 0
+
+    def stats(self):
+        return {'size': len(self._cache), 'hits': self.hits, 'store_hits': self.store_hits, 'misses': self.misses}
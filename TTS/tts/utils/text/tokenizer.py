@@ -0,0 +1,150 @@
+# -*- coding: utf-8 -*-
+
+import numpy as np
+
+from TTS.tts.utils.text.symbols import make_symbols, symbols, phonemes, _bos, _eos, _pad
+
+# characters that are never encoded even if they are part of the vocabulary
+_SKIPPED_SYMBOLS = ['~', '^', '_']
+
+
+def _make_table(vocab, skipped):
+    """Array mapping a unicode code point to its id in ``vocab``, -1 for unknown
+    characters. The last entry is -1 and catches all code points out of range."""
+    chars = [s for s in vocab if len(s) == 1]
+    table = np.full(max([ord(c) for c in chars] + [0]) + 2, -1, dtype=np.int64)
+    # later duplicates win, as in a dict built from the same list
+    for idx, s in enumerate(vocab):
+        if len(s) == 1:
+            table[ord(s)] = idx
+    for s in skipped:
+        if ord(s) < len(table) - 1:
+            table[ord(s)] = -1
+    return table
+
+
+class Tokenizer(object):
+    def __init__(self, tp=None):
+        """Encode text and phonemes to model input ids and back.
+
+        Lookup tables are built once from the ``characters`` config. Use
+        ``get_tokenizer()`` to share a single instance per config.
+
+        Args:
+            tp (dict, optional): ``characters`` config passed to ``make_symbols()``. Defaults to the default symbol set.
+        """
+        if tp:
+            self.symbols, self.phonemes = make_symbols(**tp)
+            self.bos = tp['bos']
+            self.eos = tp['eos']
+            self.pad = tp['pad']
+        else:
+            self.symbols, self.phonemes = symbols, phonemes
+            self.bos, self.eos, self.pad = _bos, _eos, _pad
+        # pylint: disable=unnecessary-comprehension
+        self.symbol_to_id = {s: i for i, s in enumerate(self.symbols)}
+        self.id_to_symbol = {i: s for i, s in enumerate(self.symbols)}
+        self.phoneme_to_id = {s: i for i, s in enumerate(self.phonemes)}
+        self.id_to_phoneme = {i: s for i, s in enumerate(self.phonemes)}
+        self._symbol_table = _make_table(self.symbols, _SKIPPED_SYMBOLS)
+        # '|' separates phonemes in the phonemizer output
+        self._phoneme_table = _make_table(self.phonemes, _SKIPPED_SYMBOLS + ['|'])
+
+    @property
+    def num_symbols(self):
+        return len(self.symbols)
+
+    @property
+    def num_phonemes(self):
+        return len(self.phonemes)
+
+    @staticmethod
+    def _encode(table, text):
+        codes = np.frombuffer(text.encode('utf-32-le'), dtype=np.uint32)
+        ids = table[np.minimum(codes, len(table) - 1)]
+        return ids[ids >= 0]
+
+    @staticmethod
+    def _encode_batch(table, texts):
+        """Encode all texts with a single table lookup."""
+        lengths = [len(text) for text in texts]
+        codes = np.frombuffer(''.join(texts).encode('utf-32-le'), dtype=np.uint32)
+        ids = table[np.minimum(codes, len(table) - 1)]
+        keep = ids >= 0
+        offsets = np.cumsum(lengths)[:-1]
+        return [ids[mask] for ids, mask in zip(np.split(ids, offsets), np.split(keep, offsets))]
+
+    @staticmethod
+    def _intersperse(ids, token):
+        result = np.full(len(ids) * 2 + 1, token, dtype=np.int64)
+        result[1::2] = ids
+        return result
+
+    def symbols_to_ids(self, text, add_blank=False):
+        """Encode cleaned text. Characters out of the vocabulary are dropped."""
+        ids = self._encode(self._symbol_table, text)
+        if add_blank:
+            ids = self._intersperse(ids, self.num_symbols)
+        return ids.tolist()
+
+    def arpabet_to_ids(self, text):
+        ids = []
+        for s in text.split():
+            s = '@' + s
+            if s in self.symbol_to_id and s not in _SKIPPED_SYMBOLS:
+                ids.append(self.symbol_to_id[s])
+        return ids
+
+    def pad_with_eos_bos(self, phoneme_sequence):
+        return [self.phoneme_to_id[self.bos]] + list(phoneme_sequence) + [self.phoneme_to_id[self.eos]]
+
+    def _finalize_phoneme_ids(self, ids, enable_eos_bos, add_blank):
+        if enable_eos_bos:
+            ids = np.concatenate([[self.phoneme_to_id[self.bos]], ids, [self.phoneme_to_id[self.eos]]])
+        if add_blank:
+            # add a blank token, whose id number is len(phonemes)
+            ids = self._intersperse(ids, self.num_phonemes)
+        return ids.tolist()
+
+    def phonemes_to_ids(self, to_phonemes, enable_eos_bos=False, add_blank=False):
+        """Encode a '|' separated phonemizer output."""
+        ids = self._encode(self._phoneme_table, to_phonemes)
+        return self._finalize_phoneme_ids(ids, enable_eos_bos, add_blank)
+
+    def phonemes_to_ids_batch(self, all_phonemes, enable_eos_bos=False, add_blank=False):
+        """Vectorized version of ``phonemes_to_ids()`` for a list of phonemizer outputs."""
+        if not all_phonemes:
+            return []
+        return [self._finalize_phoneme_ids(ids, enable_eos_bos, add_blank)
+                for ids in self._encode_batch(self._phoneme_table, all_phonemes)]
+
+    def ids_to_phonemes(self, sequence, add_blank=False):
+        if add_blank:
+            sequence = [x for x in sequence if x != self.num_phonemes]
+        result = ''.join(self.id_to_phoneme[symbol_id] for symbol_id in sequence if symbol_id in self.id_to_phoneme)
+        return result.replace('}{', ' ')
+
+    def ids_to_symbols(self, sequence, add_blank=False):
+        if add_blank:
+            sequence = [x for x in sequence if x != self.num_symbols]
+        result = ''
+        for symbol_id in sequence:
+            if symbol_id in self.id_to_symbol:
+                s = self.id_to_symbol[symbol_id]
+                # Enclose ARPAbet back in curly braces:
+                if len(s) > 1 and s[0] == '@':
+                    s = '{%s}' % s[1:]
+                result += s
+        return result.replace('}{', ' ')
+
+
+_tokenizers = {}
+
+
+def get_tokenizer(tp=None):
+    """Return the shared ``Tokenizer`` of the given ``characters`` config."""
+    key = tuple(sorted(tp.items())) if tp else None
+    tokenizer = _tokenizers.get(key)
+    if tokenizer is None:
+        tokenizer = _tokenizers.setdefault(key, Tokenizer(tp))
+    return tokenizer
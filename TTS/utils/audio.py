@@ -1,12 +1,67 @@
+import functools
+import math
+import struct
+
 import librosa
 import soundfile as sf
 import numpy as np
 import scipy.io.wavfile
 import scipy.signal
+import torch
 # import pyworld as pw
 
 from TTS.tts.utils.data import StandardScaler
 
+@functools.lru_cache(maxsize=None)
+def _cached_mel_basis(sample_rate, fft_size, num_mels, fmin, fmax):
+    """Mel filterbank shared by all the processors with the same parameters.
+    Callers must not modify it in place."""
+    return librosa.filters.mel(sample_rate, fft_size, n_mels=num_mels, fmin=fmin, fmax=fmax)
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_inv_mel_basis(sample_rate, fft_size, num_mels, fmin, fmax):
+    return np.linalg.pinv(_cached_mel_basis(sample_rate, fft_size, num_mels, fmin, fmax))
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_window(win_length, dtype=np.float64):
+    """Periodic hann window, the default window of librosa.stft and librosa.istft."""
+    return scipy.signal.get_window('hann', win_length, fftbins=True).astype(dtype)
+
+
+@functools.lru_cache(maxsize=None)
+def _cached_resample_filter(up, down):
+    """Low-pass filter designed by scipy.signal.resample_poly for the given rates."""
+    max_rate = max(up, down)
+    return scipy.signal.firwin(2 * 10 * max_rate + 1, 1. / max_rate, window=('kaiser', 5.0))
+
+
+def resample(x, orig_sr, target_sr):
+    """Polyphase resampling along the first axis. The anti-aliasing filter of each
+    ``(orig_sr, target_sr)`` pair is designed once and reused."""
+    if orig_sr == target_sr:
+        return x
+    gcd = math.gcd(int(orig_sr), int(target_sr))
+    up, down = int(target_sr) // gcd, int(orig_sr) // gcd
+    return scipy.signal.resample_poly(x, up, down, axis=0, window=_cached_resample_filter(up, down))
+
+
+def read_audio(filename, sr=None, dtype='float64'):
+    """Read a mono audio file, resampled to ``sr`` if given. Formats soundfile
+    cannot read are loaded by librosa. ``dtype`` is the sample type soundfile
+    reads, resampled signals are float32."""
+    try:
+        x, orig_sr = sf.read(filename, dtype=dtype)
+    except RuntimeError:
+        return librosa.load(filename, sr=sr)
+    if x.ndim > 1:
+        x = x.mean(axis=1)
+    if sr is None:
+        return x, orig_sr
+    return resample(x, orig_sr, sr).astype(np.float32), sr
+
+
 #pylint: disable=too-many-public-methods
 class AudioProcessor(object):
     def __init__(self,
@@ -31,10 +86,13 @@ class AudioProcessor(object):
                  stft_pad_mode='reflect',
                  clip_norm=True,
                  griffin_lim_iters=None,
+                 griffin_lim_momentum=0.0,
                  do_trim_silence=False,
                  trim_db=60,
                  do_sound_norm=False,
                  stats_path=None,
+                 stft_backend='librosa',
+                 use_float32=False,
                  verbose=True,
                  **_):
 
@@ -50,6 +108,7 @@ class AudioProcessor(object):
         self.power = power
         self.preemphasis = preemphasis
         self.griffin_lim_iters = griffin_lim_iters
+        self.griffin_lim_momentum = griffin_lim_momentum
         self.signal_norm = signal_norm
         self.symmetric_norm = symmetric_norm
         self.mel_fmin = mel_fmin or 0
@@ -62,6 +121,9 @@ class AudioProcessor(object):
         self.trim_db = trim_db
         self.do_sound_norm = do_sound_norm
         self.stats_path = stats_path
+        assert stft_backend in ('librosa', 'torch'), " [!] stft_backend should be 'librosa' or 'torch'"
+        self.stft_backend = stft_backend
+        self.use_float32 = use_float32
         # setup stft parameters
         if hop_length is None:
             # compute stft parameters from given time values
@@ -79,7 +141,8 @@ class AudioProcessor(object):
                 print(" | > {}:{}".format(key, value))
         # create spectrogram utils
         self.mel_basis = self._build_mel_basis()
-        self.inv_mel_basis = np.linalg.pinv(self._build_mel_basis())
+        self.inv_mel_basis = _cached_inv_mel_basis(*self._mel_basis_key())
+        self.window = _cached_window(self.win_length, np.float32 if use_float32 else np.float64)
         # setup scaler
         if stats_path:
             mel_mean, mel_std, linear_mean, linear_std, _ = self.load_stats(stats_path)
@@ -90,15 +153,13 @@ class AudioProcessor(object):
             self.symmetric_norm = None
 
     ### setting up the parameters ###
+    def _mel_basis_key(self):
+        return self.sample_rate, self.fft_size, self.num_mels, self.mel_fmin, self.mel_fmax
+
     def _build_mel_basis(self, ):
         if self.mel_fmax is not None:
             assert self.mel_fmax <= self.sample_rate // 2
-        return librosa.filters.mel(
-            self.sample_rate,
-            self.fft_size,
-            n_mels=self.num_mels,
-            fmin=self.mel_fmin,
-            fmax=self.mel_fmax)
+        return _cached_mel_basis(*self._mel_basis_key())
 
     def _stft_parameters(self, ):
         """Compute necessary stft parameters with given time values"""
@@ -165,6 +226,22 @@ class AudioProcessor(object):
         else:
             return S_denorm
 
+    def normalization_params(self, spec_type='mel'):
+        """Return ``(scale, shift, clip)`` such that ``normalize(S) == np.clip(scale * S + shift, *clip)``
+        for ``spec_type`` 'mel' or 'linear'. ``scale`` and ``shift`` are per channel with mean-var
+        scaling and ``clip`` is None if values are not clipped. ``denormalize()`` clips and inverts
+        the same affine transform."""
+        if not self.signal_norm:
+            return 1.0, 0.0, None
+        if hasattr(self, 'mel_scaler'):
+            scaler = getattr(self, spec_type + '_scaler')
+            return 1.0 / scaler.scale_, -scaler.mean_ / scaler.scale_, None
+        scale = self.max_norm / -self.min_level_db
+        shift = self.max_norm * (-self.ref_level_db - self.min_level_db) / -self.min_level_db
+        if self.symmetric_norm:
+            return 2 * scale, 2 * shift - self.max_norm, (-self.max_norm, self.max_norm) if self.clip_norm else None
+        return scale, shift, (0, self.max_norm) if self.clip_norm else None
+
     ### Mean-STD scaling ###
     def load_stats(self, stats_path):
         stats = np.load(stats_path, allow_pickle=True).item()  #pylint: disable=unexpected-keyword-arg
@@ -189,6 +266,27 @@ class AudioProcessor(object):
         self.mel_scaler.set_stats(mel_mean, mel_std)
         self.linear_scaler = StandardScaler()
         self.linear_scaler.set_stats(linear_mean, linear_std)
+        if self.use_float32:
+            for scaler in (self.mel_scaler, self.linear_scaler):
+                scaler.set_stats(self._cast(scaler.mean_), self._cast(scaler.scale_))
+        # drop the stats cached by the torch backend
+        self.__dict__.pop('_torch_constants', None)
+
+    ### float32 mode ###
+    def _cast(self, x):
+        """Cast ``x`` to float32 if ``use_float32``, otherwise return it unchanged."""
+        if self.use_float32:
+            return np.asarray(x, dtype=np.float32)
+        return x
+
+    def _lfilter(self, b, a, x, **kwargs):
+        """``scipy.signal.lfilter()`` computed in float32 if ``use_float32``. Plain
+        coefficient lists would promote the signal to float64."""
+        if self.use_float32:
+            b, a, x = self._cast(b), self._cast(a), self._cast(x)
+            if 'zi' in kwargs:
+                kwargs['zi'] = self._cast(kwargs['zi'])
+        return scipy.signal.lfilter(b, a, x, **kwargs)
 
     ### DB and AMP conversion ###
     # pylint: disable=no-self-use
@@ -203,12 +301,12 @@ class AudioProcessor(object):
     def apply_preemphasis(self, x):
         if self.preemphasis == 0:
             raise RuntimeError(" [!] Preemphasis is set 0.0.")
-        return scipy.signal.lfilter([1, -self.preemphasis], [1], x)
+        return self._lfilter([1, -self.preemphasis], [1], x)
 
     def apply_inv_preemphasis(self, x):
         if self.preemphasis == 0:
             raise RuntimeError(" [!] Preemphasis is set 0.0.")
-        return scipy.signal.lfilter([1], [1, -self.preemphasis], x)
+        return self._lfilter([1], [1, -self.preemphasis], x)
 
     ### SPECTROGRAMs ###
     def _linear_to_mel(self, spectrogram):
@@ -218,6 +316,7 @@ class AudioProcessor(object):
         return np.maximum(1e-10, np.dot(self.inv_mel_basis, mel_spec))
 
     def spectrogram(self, y):
+        y = self._cast(y)
         if self.preemphasis != 0:
             D = self._stft(self.apply_preemphasis(y))
         else:
@@ -226,6 +325,7 @@ class AudioProcessor(object):
         return self.normalize(S)
 
     def melspectrogram(self, y):
+        y = self._cast(y)
         if self.preemphasis != 0:
             D = self._stft(self.apply_preemphasis(y))
         else:
@@ -235,7 +335,7 @@ class AudioProcessor(object):
 
     def inv_spectrogram(self, spectrogram):
         """Converts spectrogram to waveform using librosa"""
-        S = self.denormalize(spectrogram)
+        S = self.denormalize(self._cast(spectrogram))
         S = self._db_to_amp(S)
         # Reconstruct phase
         if self.preemphasis != 0:
@@ -244,7 +344,7 @@ class AudioProcessor(object):
 
     def inv_melspectrogram(self, mel_spectrogram):
         '''Converts melspectrogram to waveform using librosa'''
-        D = self.denormalize(mel_spectrogram)
+        D = self.denormalize(self._cast(mel_spectrogram))
         S = self._db_to_amp(D)
         S = self._mel_to_linear(S)  # Convert back to linear
         if self.preemphasis != 0:
@@ -252,13 +352,233 @@ class AudioProcessor(object):
         return self._griffin_lim(S**self.power)
 
     def out_linear_to_mel(self, linear_spec):
-        S = self.denormalize(linear_spec)
+        S = self.denormalize(self._cast(linear_spec))
         S = self._db_to_amp(S)
         S = self._linear_to_mel(np.abs(S))
         S = self._amp_to_db(S)
         mel = self.normalize(S)
         return mel
 
+    ### Batched torch spectrograms ###
+    def _torch_constant(self, name, value, device):
+        """Cache a constant tensor per device."""
+        key = (name, str(device))
+        cache = self.__dict__.setdefault('_torch_constants', {})
+        if key not in cache:
+            cache[key] = torch.as_tensor(value, dtype=torch.float32, device=device)
+        return cache[key]
+
+    def _pad_torch(self, y, lengths):
+        """Center pad every signal of the batch at its own length, as librosa.stft does."""
+        pad = self.fft_size // 2
+        lengths = lengths.to(y.device).unsqueeze(1)
+        idx = torch.arange(-pad, y.shape[1] + pad, device=y.device).unsqueeze(0)
+        if self.stft_pad_mode == 'reflect':
+            idx = idx.abs()
+            idx = torch.where(idx >= lengths, 2 * (lengths - 1) - idx, idx)
+            valid = idx >= 0
+        elif self.stft_pad_mode == 'constant':
+            valid = (idx >= 0) & (idx < lengths)
+        else:
+            raise NotImplementedError(f" [!] stft_pad_mode {self.stft_pad_mode} is not supported by the torch backend.")
+        y_pad = y.gather(1, idx.clamp(0, y.shape[1] - 1).expand(y.shape[0], -1))
+        return y_pad * valid.to(y.dtype)
+
+    def _normalize_torch(self, S, spec_type):
+        """Torch version of normalize() for [B, C, T] batches of ``spec_type`` 'mel' or 'linear'."""
+        if not self.signal_norm:
+            return S
+        if hasattr(self, 'mel_scaler'):
+            scaler = getattr(self, spec_type + '_scaler')
+            mean = self._torch_constant(spec_type + '_mean', scaler.mean_, S.device).view(1, -1, 1)
+            scale = self._torch_constant(spec_type + '_scale', scaler.scale_, S.device).view(1, -1, 1)
+            return (S - mean) / scale
+        S_norm = (S - self.ref_level_db - self.min_level_db) / (-self.min_level_db)
+        if self.symmetric_norm:
+            S_norm = ((2 * self.max_norm) * S_norm) - self.max_norm
+            if self.clip_norm:
+                S_norm = S_norm.clamp(-self.max_norm, self.max_norm)
+            return S_norm
+        S_norm = self.max_norm * S_norm
+        if self.clip_norm:
+            S_norm = S_norm.clamp(0, self.max_norm)
+        return S_norm
+
+    def spectrograms_torch(self, y, lengths=None, compute_linear=False):
+        """Compute normalized mel and linear spectrograms of a padded batch of
+        waveforms with a single torch.stft call. Results match ``melspectrogram()``
+        and ``spectrogram()`` of each unpadded waveform.
+
+        Args:
+            y (Tensor): [B, T] zero padded waveforms.
+            lengths (Tensor, optional): [B] waveform lengths. Defaults to T for all.
+            compute_linear (bool, optional): also return the linear spectrogram. Defaults to False.
+
+        Returns:
+            Tuple[Tensor, Tensor, Tensor]: mel [B, num_mels, T'], linear [B, fft_size // 2 + 1, T'] or None,
+                and the number of frames of each waveform [B]. Frames past each length are zero.
+        """
+        y = torch.as_tensor(y, dtype=torch.float32)
+        if lengths is None:
+            lengths = torch.full((y.shape[0], ), y.shape[1], dtype=torch.long)
+        lengths = torch.as_tensor(lengths, dtype=torch.long)
+        if self.preemphasis != 0:
+            y = torch.cat([y[:, :1], y[:, 1:] - self.preemphasis * y[:, :-1]], dim=1)
+        window = self._torch_constant('window', self.window, y.device)
+        D = torch.stft(self._pad_torch(y, lengths), self.fft_size, self.hop_length, self.win_length, window,
+                       center=False, return_complex=True)
+        S = D.abs()
+        spec_lengths = lengths // self.hop_length + 1
+        mask = (torch.arange(S.shape[2], device=y.device).unsqueeze(0) < spec_lengths.to(y.device).unsqueeze(1))
+        mask = mask.unsqueeze(1).to(S.dtype)
+        mel_basis = self._torch_constant('mel_basis', self.mel_basis, y.device)
+        mel = self._amp_to_db_torch(torch.matmul(mel_basis, S))
+        mel = self._normalize_torch(mel, 'mel') * mask
+        linear = None
+        if compute_linear:
+            linear = self._normalize_torch(self._amp_to_db_torch(S), 'linear') * mask
+        return mel, linear, spec_lengths
+
+    def _amp_to_db_torch(self, x):
+        return self.spec_gain * torch.log10(x.clamp(min=1e-5))
+
+    def _db_to_amp_torch(self, x):
+        return torch.pow(10.0, x / self.spec_gain)
+
+    def _denormalize_torch(self, S, spec_type):
+        """Torch version of denormalize() for [B, C, T] batches of ``spec_type`` 'mel' or 'linear'."""
+        if not self.signal_norm:
+            return S
+        if hasattr(self, 'mel_scaler'):
+            scaler = getattr(self, spec_type + '_scaler')
+            mean = self._torch_constant(spec_type + '_mean', scaler.mean_, S.device).view(1, -1, 1)
+            scale = self._torch_constant(spec_type + '_scale', scaler.scale_, S.device).view(1, -1, 1)
+            return S * scale + mean
+        if self.symmetric_norm:
+            if self.clip_norm:
+                S = S.clamp(-self.max_norm, self.max_norm)
+            S = ((S + self.max_norm) * -self.min_level_db / (2 * self.max_norm)) + self.min_level_db
+        else:
+            if self.clip_norm:
+                S = S.clamp(0, self.max_norm)
+            S = (S * -self.min_level_db / self.max_norm) + self.min_level_db
+        return S + self.ref_level_db
+
+    def _griffin_lim_torch(self, S):
+        """Batched Griffin-Lim on a [B, F, T] magnitude tensor in float32. A
+        ``griffin_lim_momentum`` larger than 0 enables the fast Griffin-Lim update
+        (Perraudin et al., 2013)."""
+        window = self._torch_constant('window', self.window, S.device)
+
+        def _stft(y):
+            return torch.stft(y, self.fft_size, self.hop_length, self.win_length, window,
+                              center=True, pad_mode=self.stft_pad_mode, return_complex=True)
+
+        def _istft(D):
+            return torch.istft(D, self.fft_size, self.hop_length, self.win_length, window, center=True)
+
+        S = S.float()
+        angles = torch.polar(torch.ones_like(S), 2 * np.pi * torch.rand_like(S))
+        y = _istft(S * angles)
+        rebuilt = 0
+        for _ in range(self.griffin_lim_iters):
+            prev_rebuilt = rebuilt
+            rebuilt = _stft(y)
+            angles = rebuilt - (self.griffin_lim_momentum / (1 + self.griffin_lim_momentum)) * prev_rebuilt
+            angles = angles / (angles.abs() + 1e-16)
+            y = _istft(S * angles)
+        return y
+
+    def _griffin_lim_batch(self, S, lengths):
+        if lengths is not None:
+            # silence the padded frames
+            lengths = torch.as_tensor(lengths, device=S.device).view(-1, 1, 1)
+            S = S * (torch.arange(S.shape[2], device=S.device).view(1, 1, -1) < lengths).to(S.dtype)
+        wavs = self._griffin_lim_torch(S**self.power).cpu().numpy()
+        if self.preemphasis != 0:
+            wavs = self._lfilter([1], [1, -self.preemphasis], wavs, axis=-1).astype(np.float32)
+        return wavs
+
+    def inv_spectrogram_batch(self, S, lengths=None):
+        """Convert a [B, C, T] batch of linear spectrograms to waveforms [B, (T - 1) * hop_length]
+        with batched Griffin-Lim. Frames past ``lengths`` are ignored."""
+        S = self._denormalize_torch(torch.as_tensor(S, dtype=torch.float32), 'linear')
+        S = self._db_to_amp_torch(S)
+        return self._griffin_lim_batch(S, lengths)
+
+    def inv_melspectrogram_batch(self, mel, lengths=None):
+        """Convert a [B, C, T] batch of mel spectrograms to waveforms [B, (T - 1) * hop_length]
+        with batched Griffin-Lim. Frames past ``lengths`` are ignored."""
+        S = self._denormalize_torch(torch.as_tensor(mel, dtype=torch.float32), 'mel')
+        S = self._db_to_amp_torch(S)
+        inv_mel_basis = self._torch_constant('inv_mel_basis', self.inv_mel_basis, S.device)
+        S = torch.matmul(inv_mel_basis, S).clamp(min=1e-10)  # Convert back to linear
+        return self._griffin_lim_batch(S, lengths)
+
+    ### Streaming spectrograms ###
+    def stream_spectrograms(self, filename, block_size=65536, compute_linear=False):
+        """Compute normalized spectrograms of an audio file reading it block by block.
+
+        Only a block of samples and its spectrogram frames are kept in memory, so
+        arbitrarily long recordings can be processed. The STFT overlap and the
+        preemphasis state are carried between blocks and the signal edges are
+        padded as in ``_stft()``, so the concatenated frames match ``melspectrogram()``
+        and ``spectrogram()`` of the full signal. Silence trimming, sound
+        normalization and resampling need the full signal and are not applied.
+        Multichannel files are downmixed to mono by averaging the channels, as in
+        ``read_audio()``.
+
+        Args:
+            filename (str): path to an audio file readable by soundfile, at ``sample_rate``.
+            block_size (int, optional): number of samples read at once. Defaults to 65536.
+            compute_linear (bool, optional): also yield the linear spectrogram. Defaults to False.
+
+        Yields:
+            Tuple[np.ndarray, np.ndarray]: mel [num_mels, T] and linear [fft_size // 2 + 1, T] or None.
+        """
+        sr = sf.info(filename).samplerate
+        assert sr == self.sample_rate, "%s vs %s" % (self.sample_rate, sr)
+        assert self.stft_pad_mode == 'reflect', " [!] streaming spectrograms only support 'reflect' padding."
+        block_size = max(block_size, self.fft_size)
+        pad = self.fft_size // 2
+        zi = np.zeros(1)
+        buffer = None
+        tail = None
+        for block in sf.blocks(filename, blocksize=block_size, dtype='float32' if self.use_float32 else 'float64',
+                               always_2d=True):
+            block = block.mean(axis=1)
+            if self.preemphasis != 0:
+                block, zi = self._lfilter([1, -self.preemphasis], [1], block, zi=zi)
+            if buffer is None:
+                # reflect padding of the signal start
+                buffer = np.concatenate([block[1:pad + 1][::-1], block])
+            else:
+                buffer = np.concatenate([buffer, block])
+            # last samples of the signal for the reflect padding of its end
+            tail = np.concatenate([tail, block])[-(pad + 1):] if tail is not None else block[-(pad + 1):]
+            buffer = yield from self._stream_frames(buffer, compute_linear)
+        if buffer is None:
+            return
+        buffer = np.concatenate([buffer, tail[:-1][::-1]])
+        yield from self._stream_frames(buffer, compute_linear)
+
+    def _stream_frames(self, buffer, compute_linear):
+        """Yield the spectrograms of all complete frames in ``buffer`` and return the
+        samples needed by the next frames."""
+        num_frames = 1 + (len(buffer) - self.fft_size) // self.hop_length if len(buffer) >= self.fft_size else 0
+        if num_frames > 0:
+            D = librosa.stft(y=buffer[:(num_frames - 1) * self.hop_length + self.fft_size],
+                             n_fft=self.fft_size,
+                             hop_length=self.hop_length,
+                             win_length=self.win_length,
+                             window=self.window,
+                             center=False)
+            S = np.abs(D)
+            mel = self.normalize(self._amp_to_db(self._linear_to_mel(S)))
+            linear = self.normalize(self._amp_to_db(S)) if compute_linear else None
+            yield mel, linear
+        return buffer[num_frames * self.hop_length:]
+
     ### STFT and ISTFT ###
     def _stft(self, y):
         return librosa.stft(
@@ -266,16 +586,19 @@ class AudioProcessor(object):
             n_fft=self.fft_size,
             hop_length=self.hop_length,
             win_length=self.win_length,
+            window=self.window,
             pad_mode=self.stft_pad_mode,
         )
 
     def _istft(self, y):
         return librosa.istft(
-            y, hop_length=self.hop_length, win_length=self.win_length)
+            y, hop_length=self.hop_length, win_length=self.win_length, window=self.window)
 
     def _griffin_lim(self, S):
-        angles = np.exp(2j * np.pi * np.random.rand(*S.shape))
-        S_complex = np.abs(S).astype(np.complex)
+        if self.stft_backend == 'torch':
+            return self._griffin_lim_torch(torch.from_numpy(np.asarray(S, dtype=np.float32)).unsqueeze(0))[0].numpy()
+        angles = np.exp(2j * np.pi * self._cast(np.random.rand(*S.shape)))
+        S_complex = np.abs(S).astype(angles.dtype)
         y = self._istft(S_complex * angles)
         for _ in range(self.griffin_lim_iters):
             angles = np.exp(1j * np.angle(self._stft(y)))
@@ -304,14 +627,23 @@ class AudioProcessor(object):
 
     ### Audio Processing ###
     def find_endpoint(self, wav, threshold_db=-40, min_silence_sec=0.8):
+        """Return the end of the first window of ``min_silence_sec`` whose max is below ``threshold_db``
+        plus a quarter window, or the wav length if there is none. Windows start every quarter window."""
         window_length = int(self.sample_rate * min_silence_sec)
         hop_length = int(window_length / 4)
         threshold = self._db_to_amp(threshold_db)
-        for x in range(hop_length, len(wav) - window_length, hop_length):
-            if np.max(wav[x:x + window_length]) < threshold:
-                return x + hop_length
+        num_windows = len(range(hop_length, len(wav) - window_length, hop_length))
+        if num_windows > 0:
+            maxima = window_maxima(np.asarray(wav)[hop_length:], window_length, hop_length, num_windows)
+            silent = np.flatnonzero(maxima < threshold)
+            if silent.size > 0:
+                return int(silent[0] + 2) * hop_length
         return len(wav)
 
+    def endpoint_detector(self, threshold_db=-40, min_silence_sec=0.8):
+        """Return an ``EndpointDetector`` deciding ``find_endpoint()`` on audio arriving in chunks."""
+        return EndpointDetector(self.sample_rate, self._db_to_amp(threshold_db), min_silence_sec)
+
     def trim_silence(self, wav):
         """ Trim silent parts with a threshold and 0.01 sec margin """
         margin = int(self.sample_rate * 0.01)
@@ -325,13 +657,14 @@ class AudioProcessor(object):
 
     ### save and load ###
     def load_wav(self, filename, sr=None):
+        dtype = 'float32' if self.use_float32 else 'float64'
         if self.resample:
-            x, sr = librosa.load(filename, sr=self.sample_rate)
+            x, sr = read_audio(filename, sr=self.sample_rate, dtype=dtype)
         elif sr is None:
-            x, sr = sf.read(filename)
+            x, sr = sf.read(filename, dtype=dtype)
             assert self.sample_rate == sr, "%s vs %s"%(self.sample_rate, sr)
         else:
-            x, sr = librosa.load(filename, sr=sr)
+            x, sr = read_audio(filename, sr=sr, dtype=dtype)
         if self.do_trim_silence:
             try:
                 x = self.trim_silence(x)
@@ -339,12 +672,25 @@ class AudioProcessor(object):
                 print(f' [!] File cannot be trimmed for silence - {filename}')
         if self.do_sound_norm:
             x = self.sound_norm(x)
-        return x
+        return self._cast(x)
 
     def save_wav(self, wav, path):
-        wav_norm = wav * (32767 / max(0.01, np.max(np.abs(wav))))
+        wav = np.asarray(wav)
+        peak = max(0.01, float(np.max(np.abs(wav))))
+        wav_norm = wav * np.asarray(32767 / peak, dtype=wav.dtype)
         scipy.io.wavfile.write(path, self.sample_rate, wav_norm.astype(np.int16))
 
+    @staticmethod
+    def wav_header(sample_rate, num_samples=None, bits=16, num_channels=1):
+        """Build a PCM RIFF/WAVE header. If ``num_samples`` is None, size fields
+        are set to their maximum value so that the header can precede a stream
+        of unknown length."""
+        block_align = num_channels * bits // 8
+        data_size = 0xFFFFFFFF - 36 if num_samples is None else num_samples * block_align
+        return struct.pack('<4sI4s4sIHHIIHH4sI', b'RIFF', 36 + data_size, b'WAVE', b'fmt ', 16, 1,
+                           num_channels, sample_rate, sample_rate * block_align, block_align, bits,
+                           b'data', data_size)
+
     @staticmethod
     def mulaw_encode(wav, qc):
         mu = 2 ** qc - 1
@@ -373,3 +719,73 @@ class AudioProcessor(object):
     @staticmethod
     def dequantize(x, bits):
         return 2 * x / (2**bits - 1) - 1
+
+
+def window_maxima(wav, window_length, hop_length, num_windows):
+    """Compute ``max(wav[x:x + window_length])`` for the first ``num_windows`` windows starting
+    every ``hop_length`` samples. Each sample is visited once to find per hop maxima, which
+    are then combined across the hops of a window."""
+    num_hops, rest = divmod(window_length, hop_length)
+    num_blocks = num_windows + num_hops + (rest > 0)
+    blocks = np.full(num_blocks * hop_length, -np.inf, dtype=np.result_type(wav.dtype, np.float32))
+    wav = wav[:len(blocks)]
+    blocks[:len(wav)] = wav
+    blocks = blocks.reshape(num_blocks, hop_length)
+    block_maxima = blocks.max(1)
+    maxima = block_maxima[:num_windows].copy()
+    for idx in range(1, num_hops):
+        np.maximum(maxima, block_maxima[idx:idx + num_windows], out=maxima)
+    if rest > 0:
+        np.maximum(maxima, blocks[num_hops:num_hops + num_windows, :rest].max(1), out=maxima)
+    return maxima
+
+
+class EndpointDetector(object):
+    def __init__(self, sample_rate, threshold, min_silence_sec=0.8):
+        """Streaming version of ``AudioProcessor.find_endpoint()``.
+
+        Feed audio chunks as they arrive, e.g. from a vocoder. The endpoint is
+        decided as soon as a silent window is complete and matches the value
+        ``find_endpoint()`` returns for the full signal.
+
+        Args:
+            sample_rate (int): audio sample rate.
+            threshold (float): amplitude below which a window is silent.
+            min_silence_sec (float, optional): window length in seconds. Defaults to 0.8.
+        """
+        self.window_length = int(sample_rate * min_silence_sec)
+        self.hop_length = int(self.window_length / 4)
+        self.threshold = threshold
+        self.num_samples = 0
+        self.endpoint = None
+        # start of the next window to check and of the buffered samples
+        self._next_window = self.hop_length
+        self._buffer_start = 0
+        self._buffer = np.zeros(0, dtype=np.float32)
+
+    def push(self, chunk):
+        """Add the next chunk. Returns the endpoint once it is found, None otherwise."""
+        if self.endpoint is not None:
+            return self.endpoint
+        self._buffer = np.concatenate([self._buffer, np.asarray(chunk)])
+        self.num_samples += len(chunk)
+        # samples before the next window are not needed anymore
+        drop = min(self._next_window - self._buffer_start, len(self._buffer))
+        self._buffer = self._buffer[drop:]
+        self._buffer_start += drop
+        # windows followed by at least one sample, as in find_endpoint()
+        remaining = self.num_samples - self.window_length - self._next_window
+        num_windows = max(0, -(-remaining // self.hop_length))
+        if num_windows > 0:
+            maxima = window_maxima(self._buffer, self.window_length, self.hop_length, num_windows)
+            silent = np.flatnonzero(maxima < self.threshold)
+            if silent.size > 0:
+                self.endpoint = self._next_window + int(silent[0] + 1) * self.hop_length
+                self._buffer = self._buffer[:0]
+                return self.endpoint
+            self._next_window += num_windows * self.hop_length
+        return None
+
+    def finish(self):
+        """Return the endpoint, or the number of samples received if no silence was found."""
+        return self.num_samples if self.endpoint is None else self.endpoint
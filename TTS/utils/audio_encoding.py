@@ -0,0 +1,124 @@
+import io
+
+import numpy as np
+import soundfile as sf
+
+from TTS.utils.audio import AudioProcessor, resample
+
+# mimetype of each output format
+OUTPUT_FORMATS = {
+    'wav': 'audio/wav',
+    'pcm': 'application/octet-stream',
+    'mulaw': 'audio/basic',
+    'ogg': 'audio/ogg',
+}
+
+# sample rates supported by the Opus codec
+OPUS_SAMPLE_RATES = (8000, 12000, 16000, 24000, 48000)
+
+
+def pcm16_to_mulaw(pcm):
+    """G.711 mu-law encoding of 16 bit PCM samples, vectorized from the Sun
+    reference implementation also used by ``audioop.lin2ulaw()``."""
+    pcm = np.asarray(pcm, dtype=np.int32) >> 2
+    mask = np.where(pcm < 0, 0x7F, 0xFF)
+    # biased 14 bit magnitude in [0x21, 0x2000]
+    magnitude = np.minimum(np.abs(pcm), 8159) + 0x21
+    # segment of the magnitude, 8 for the clipped maximum
+    segment = np.frexp(magnitude)[1] - 6
+    mantissa = (magnitude >> (segment + 1)) & 0x0F
+    ulaw = np.where(segment < 8, (segment << 4) | mantissa, 0x7F)
+    return (ulaw ^ mask).astype(np.uint8)
+
+
+def default_sample_rate(output_format, sample_rate):
+    """Output sample rate used when none is requested. mu-law is for telephony
+    at 8 kHz and Opus only supports a few sample rates."""
+    if output_format == 'mulaw':
+        return 8000
+    if output_format == 'ogg' and sample_rate not in OPUS_SAMPLE_RATES:
+        return min([sr for sr in OPUS_SAMPLE_RATES if sr >= sample_rate] + [48000])
+    return sample_rate
+
+
+class AudioEncoder(object):
+    def __init__(self, output_format='wav', sample_rate=22050, target_sample_rate=None):
+        """Resample and encode waveforms chunk by chunk, so that the encoded audio
+        can be sent while the rest is being synthesized.
+
+        Output formats:
+            wav: 16 bit PCM WAV.
+            pcm: headerless 16 bit little-endian PCM.
+            mulaw: headerless 8 bit G.711 mu-law, 8 kHz by default.
+            ogg: Opus in an Ogg container. Needs libsndfile 1.0.29 or newer.
+
+        Chunks are resampled independently. Split the audio at silences, as
+        ``Synthesizer.tts_stream()`` does, to avoid artifacts at chunk edges.
+
+        Args:
+            output_format (str, optional): one of ``OUTPUT_FORMATS``. Defaults to 'wav'.
+            sample_rate (int, optional): sample rate of the input waveforms. Defaults to 22050.
+            target_sample_rate (int, optional): sample rate of the output. Defaults to ``default_sample_rate()``.
+        """
+        if output_format not in OUTPUT_FORMATS:
+            raise ValueError(f" [!] Unknown output format {output_format}. Use one of {list(OUTPUT_FORMATS)}.")
+        if target_sample_rate is None:
+            target_sample_rate = default_sample_rate(output_format, sample_rate)
+        if target_sample_rate <= 0:
+            raise ValueError(f" [!] Invalid sample rate {target_sample_rate}.")
+        self.output_format = output_format
+        self.sample_rate = sample_rate
+        self.target_sample_rate = target_sample_rate
+        self._file = None
+        if output_format == 'ogg':
+            if target_sample_rate not in OPUS_SAMPLE_RATES:
+                raise ValueError(f" [!] Opus does not support {target_sample_rate} Hz. Use one of {OPUS_SAMPLE_RATES}.")
+            if 'OPUS' not in sf.available_subtypes('OGG'):
+                raise ValueError(" [!] Opus encoding is not supported by the installed libsndfile.")
+            self._buffer = io.BytesIO()
+            self._num_sent = 0
+            self._file = sf.SoundFile(self._buffer, 'w', samplerate=target_sample_rate, channels=1,
+                                      format='OGG', subtype='OPUS')
+
+    @property
+    def mimetype(self):
+        return OUTPUT_FORMATS[self.output_format]
+
+    def header(self, num_samples=None):
+        """Bytes preceding the encoded chunks. Give the number of output samples if
+        known, otherwise WAV size fields are set for a stream of unknown length."""
+        if self.output_format == 'wav':
+            return AudioProcessor.wav_header(self.target_sample_rate, num_samples)
+        return b''
+
+    def _drain(self):
+        """Return the Ogg pages written since the last call."""
+        with self._buffer.getbuffer() as data:
+            new_data = data[self._num_sent:].tobytes()
+        self._num_sent += len(new_data)
+        return new_data
+
+    def encode(self, wav):
+        """Encode a float waveform chunk in [-1, 1] at ``sample_rate``. The result can
+        be empty if the encoder buffers the samples."""
+        wav = resample(np.asarray(wav, dtype=np.float32), self.sample_rate, self.target_sample_rate)
+        if self._file is not None:
+            self._file.write(np.asarray(wav, dtype=np.float32))
+            return self._drain()
+        pcm = AudioProcessor.encode_16bits(wav)
+        if self.output_format == 'mulaw':
+            return pcm16_to_mulaw(pcm).tobytes()
+        return pcm.astype('<i2').tobytes()
+
+    def finish(self):
+        """Flush the encoder and return the remaining bytes."""
+        if self._file is None:
+            return b''
+        self._file.close()
+        return self._drain()
+
+    def encode_all(self, wav):
+        """Encode a complete waveform with exact header fields."""
+        data = self.encode(wav)
+        num_samples = len(data) // 2 if self.output_format == 'wav' else None
+        return self.header(num_samples) + data + self.finish()
@@ -1,3 +1,5 @@
+import re
+import threading
 import time
 
 import numpy as np
@@ -5,19 +7,20 @@ import torch
 import pysbd
 
 from TTS.utils.audio import AudioProcessor
+from TTS.utils.audio_encoding import AudioEncoder
 from TTS.utils.io import load_config
 from TTS.tts.utils.generic_utils import setup_model
 from TTS.tts.utils.speakers import load_speaker_mapping
-from TTS.vocoder.utils.generic_utils import setup_generator, interpolate_vocoder_input
+from TTS.vocoder.utils.generic_utils import setup_generator, VocoderInputAdapter
 # pylint: disable=unused-wildcard-import
 # pylint: disable=wildcard-import
 from TTS.tts.utils.synthesis import *
 
-from TTS.tts.utils.text import make_symbols, phonemes, symbols
+from TTS.tts.utils.text import get_tokenizer
 
 
 class Synthesizer(object):
-    def __init__(self, tts_checkpoint, tts_config, vocoder_checkpoint=None, vocoder_config=None, use_cuda=False):
+    def __init__(self, tts_checkpoint, tts_config, vocoder_checkpoint=None, vocoder_config=None, use_cuda=False, max_batch_size=8):
         """Encapsulation of tts and vocoder models for inference.
 
         TODO: handle multi-speaker and GST inference.
@@ -28,19 +31,26 @@ class Synthesizer(object):
             vocoder_checkpoint (str, optional): path to the vocoder model file. Defaults to None.
             vocoder_config (str, optional): path to the vocoder config file. Defaults to None.
             use_cuda (bool, optional): enable/disable cuda. Defaults to False.
+            max_batch_size (int, optional): max number of sentences of a text synthesized together by `tts()`. Defaults to 8.
         """
         self.tts_checkpoint = tts_checkpoint
         self.tts_config = tts_config
         self.vocoder_checkpoint = vocoder_checkpoint
         self.vocoder_config = vocoder_config
         self.use_cuda = use_cuda
+        self.max_batch_size = max_batch_size
         self.wavernn = None
         self.vocoder_model = None
         self.num_speakers = 0
         self.tts_speakers = None
         self.speaker_embedding_dim = None
         self.seg = self.get_segmenter("en")
+        # number of silent samples inserted after each sentence
+        self.silence_length = 10000
         self.use_cuda = use_cuda
+        # models keep state between calls, e.g. decoder attention and memory buffers,
+        # so concurrent callers like server threads must not run them at the same time
+        self._inference_lock = threading.Lock()
         if self.use_cuda:
             assert torch.cuda.is_available(), "CUDA is not availabe on this machine."
         self.load_tts(tts_checkpoint, tts_config,
@@ -74,20 +84,17 @@ class Synthesizer(object):
         return speaker_embedding
 
     def load_tts(self, tts_checkpoint, tts_config, use_cuda):
-        # pylint: disable=global-statement
-        global symbols, phonemes
-
         self.tts_config = load_config(tts_config)
         self.use_phonemes = self.tts_config.use_phonemes
         self.ap = AudioProcessor(**self.tts_config.audio)
 
-        if 'characters' in self.tts_config.keys():
-            symbols, phonemes = make_symbols(**self.tts_config.characters)
+        # shared with the text functions called with the same characters config
+        self.tokenizer = get_tokenizer(self.tts_config.characters if 'characters' in self.tts_config.keys() else None)
 
         if self.use_phonemes:
-            self.input_size = len(phonemes)
+            self.input_size = self.tokenizer.num_phonemes
         else:
-            self.input_size = len(symbols)
+            self.input_size = self.tokenizer.num_symbols
 
         self.tts_model = setup_model(self.input_size, num_speakers=self.num_speakers, c=self.tts_config)
         self.tts_model.load_checkpoint(tts_config, tts_checkpoint, eval=True)
@@ -101,65 +108,161 @@ class Synthesizer(object):
         self.vocoder_model.load_checkpoint(self.vocoder_config, model_file, eval=True)
         if use_cuda:
             self.vocoder_model.cuda()
+        # converts tts model outputs to vocoder inputs
+        self.vocoder_adapter = VocoderInputAdapter(self.ap, self.vocoder_ap, device="cuda" if use_cuda else "cpu")
 
     def save_wav(self, wav, path):
-        wav = np.array(wav)
+        wav = np.asarray(wav, dtype=np.float32)
         self.ap.save_wav(wav, path)
 
+    @property
+    def output_sample_rate(self):
+        """Sample rate of the synthesized waveforms."""
+        if self.vocoder_model is not None:
+            return self.vocoder_ap.sample_rate
+        return self.ap.sample_rate
+
+    def audio_encoder(self, output_format='wav', sample_rate=None):
+        """Return an ``AudioEncoder`` converting the synthesized waveforms to
+        ``output_format`` at ``sample_rate``. Raises ValueError for unsupported values."""
+        return AudioEncoder(output_format, self.output_sample_rate, sample_rate)
+
+    @staticmethod
+    def encode(wav, encoder):
+        """Peak normalize a complete waveform, as ``save_wav()`` does, and encode it."""
+        wav = np.asarray(wav, dtype=np.float32)
+        peak = max(0.01, float(np.max(np.abs(wav)))) if len(wav) > 0 else 1.0
+        return encoder.encode_all(wav / peak)
+
     def split_into_sentences(self, text):
         return self.seg.segment(text)
 
-    def tts(self, text, speaker_idx=None):
-        start_time = time.time()
-        wavs = []
-        sens = self.split_into_sentences(text)
-        print(" > Text splitted to sentences.")
-        print(sens)
+    def merge_sentences(self, sentence_wavs):
+        """Concatenate sentence waveforms with a fixed silence in between into
+        a single float32 array."""
+        total_length = sum(len(waveform) + self.silence_length for waveform in sentence_wavs)
+        wavs = np.zeros(total_length, dtype=np.float32)
+        offset = 0
+        for waveform in sentence_wavs:
+            wavs[offset:offset + len(waveform)] = waveform
+            # silence is already in place, skip over it
+            offset += len(waveform) + self.silence_length
+        return wavs
 
-        speaker_embedding = self.init_speaker(speaker_idx)
-        use_gl = self.vocoder_model is None
+    def tts_batch(self, sentences, speaker_idx=None):
+        """Synthesize a list of sentences as one padded batch through the tts
+        model and the vocoder. Models are run by one caller at a time, so this
+        can be called from several threads, e.g. the server batch scheduler and
+        streaming requests.
 
-        for sen in sens:
-            # synthesize voice
-            waveform, _, _, mel_postnet_spec, _, _ = synthesis(
+        Args:
+            sentences (List[str]): sentences to synthesize.
+            speaker_idx (int, optional): speaker shared by all the sentences. Defaults to None.
+
+        Returns:
+            List[np.ndarray]: silence trimmed waveform per sentence.
+        """
+        with self._inference_lock:
+            speaker_embedding = self.init_speaker(speaker_idx)
+            mel_postnet_specs = synthesis_batch(
                 self.tts_model,
-                sen,
+                sentences,
                 self.tts_config,
                 self.use_cuda,
                 self.ap,
                 speaker_idx,
-                None,
-                False,
-                self.tts_config.enable_eos_bos_chars,
-                use_gl,
                 speaker_embedding=speaker_embedding)
-            if not use_gl:
-                # denormalize tts output based on tts audio config
-                mel_postnet_spec = self.ap.denormalize(mel_postnet_spec.T).T
-                device_type = "cuda" if self.use_cuda else "cpu"
-                # renormalize spectrogram based on vocoder config
-                vocoder_input = self.vocoder_ap.normalize(mel_postnet_spec.T)
-                # compute scale factor for possible sample rate mismatch
-                scale_factor = [1, self.vocoder_config['audio']['sample_rate'] / self.ap.sample_rate]
-                if scale_factor[1] != 1:
-                    print(" > interpolating tts model output.")
-                    vocoder_input = interpolate_vocoder_input(scale_factor, vocoder_input)
-                else:
-                    vocoder_input = torch.tensor(vocoder_input).unsqueeze(0)  # pylint: disable=not-callable
+            if self.vocoder_model is None:
+                spec_lengths = [mel_postnet_spec.shape[0] for mel_postnet_spec in mel_postnet_specs]
+                specs = np.zeros((len(mel_postnet_specs), max(spec_lengths), mel_postnet_specs[0].shape[1]), dtype=np.float32)
+                for idx, mel_postnet_spec in enumerate(mel_postnet_specs):
+                    specs[idx, :spec_lengths[idx]] = mel_postnet_spec
+                waveforms = apply_griffin_lim(specs, spec_lengths, self.tts_config, self.ap)
+            else:
+                # padded to the longest sample. padded frames are cut from the output below.
+                vocoder_input, vocoder_lengths = self.vocoder_adapter(mel_postnet_specs)
                 # run vocoder model
-                # [1, T, C]
-                waveform = self.vocoder_model.inference(vocoder_input.to(device_type))
-            if self.use_cuda and not use_gl:
-                waveform = waveform.cpu()
-            if not use_gl:
-                waveform = waveform.numpy()
-            waveform = waveform.squeeze()
-
-            # trim silence
-            waveform = trim_silence(waveform, self.ap)
-
-            wavs += list(waveform)
-            wavs += [0] * 10000
+                # [B, 1, T]
+                outputs = self.vocoder_model.inference(vocoder_input).detach().cpu().numpy()
+                outputs = outputs.reshape(outputs.shape[0], -1)
+                # drop the samples generated from the padded frames of shorter samples
+                pad_lengths = [(max(vocoder_lengths) - length) * self.vocoder_ap.hop_length for length in vocoder_lengths]
+                waveforms = [output[:output.shape[0] - pad_length] for output, pad_length in zip(outputs, pad_lengths)]
+        return [trim_silence(waveform, self.ap) for waveform in waveforms]
+
+    def split_long_sentence(self, sentence, max_chars):
+        """Split a sentence longer than ``max_chars`` at clause boundaries."""
+        if max_chars is None or len(sentence) <= max_chars:
+            return [sentence]
+        clauses = re.findall(r'[^,;:]+[,;:]?', sentence)
+        sub_sentences = ['']
+        for clause in clauses:
+            if sub_sentences[-1] and len(sub_sentences[-1]) + len(clause) > max_chars:
+                sub_sentences.append('')
+            sub_sentences[-1] += clause
+        return [sub_sen.strip() for sub_sen in sub_sentences if sub_sen.strip()]
+
+    def tts_stream(self, text, speaker_idx=None, max_chars=None):
+        """Synthesize the given text sentence by sentence.
+
+        Args:
+            text (str): input text.
+            speaker_idx (int, optional): speaker id for multi-speaker models. Defaults to None.
+            max_chars (int, optional): sentences longer than this are split at clause
+                boundaries and yielded in pieces. Defaults to None.
+
+        Yields:
+            np.ndarray: float32 waveform of each sentence (or sentence piece), followed
+                by a silence chunk after each sentence.
+        """
+        sens = self.split_into_sentences(text)
+        print(" > Text splitted to sentences.")
+        print(sens)
+        for sen in sens:
+            for sub_sen in self.split_long_sentence(sen, max_chars):
+                waveform = self.tts_batch([sub_sen], speaker_idx)[0]
+                yield waveform.astype(np.float32, copy=False)
+            yield np.zeros(self.silence_length, dtype=np.float32)
+
+    def tts_stream_encoded(self, text, encoder, speaker_idx=None, max_chars=None):
+        """Encode the chunks of ``tts_stream()`` as they are synthesized.
+
+        Args:
+            text (str): input text.
+            encoder (AudioEncoder): encoder of the output format, see ``audio_encoder()``.
+            speaker_idx (int, optional): speaker id for multi-speaker models. Defaults to None.
+            max_chars (int, optional): see ``tts_stream()``. Defaults to None.
+
+        Yields:
+            bytes: the header of the output format, then the encoded audio. There is
+                no peak normalization as the peak of the whole utterance is unknown.
+        """
+        header = encoder.header()
+        if header:
+            yield header
+        for wav in self.tts_stream(text, speaker_idx, max_chars):
+            data = encoder.encode(wav)
+            if data:
+                yield data
+        data = encoder.finish()
+        if data:
+            yield data
+
+    def tts(self, text, speaker_idx=None):
+        start_time = time.time()
+        sens = self.split_into_sentences(text)
+        print(" > Text splitted to sentences.")
+        print(sens)
+
+        # batch sentences of similar length together to reduce padding
+        sentence_wavs = [None] * len(sens)
+        sorted_idxs = sorted(range(len(sens)), key=lambda idx: len(sens[idx]))
+        for offset in range(0, len(sens), self.max_batch_size):
+            batch_idxs = sorted_idxs[offset:offset + self.max_batch_size]
+            waveforms = self.tts_batch([sens[idx] for idx in batch_idxs], speaker_idx)
+            for idx, waveform in zip(batch_idxs, waveforms):
+                sentence_wavs[idx] = waveform
+        wavs = self.merge_sentences(sentence_wavs)
 
         # compute stats
         process_time = time.time() - start_time
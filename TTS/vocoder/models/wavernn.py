@@ -351,7 +351,6 @@ class WaveRNN(nn.Module):
 
         output = torch.stack(output).transpose(0, 1)
         output = output.cpu().numpy()
-        output = output.astype(np.float64)
 
         if batched:
             output = self.xfade_and_unfold(output, target, overlap)
@@ -362,7 +361,7 @@ class WaveRNN(nn.Module):
             output = ap.mulaw_decode(output, self.mode)
 
         # Fade-out at the end to avoid signal cutting out suddenly
-        fade_out = np.linspace(1, 0, 20 * self.hop_length)
+        fade_out = np.linspace(1, 0, 20 * self.hop_length, dtype=np.float32)
         output = output[:wave_len]
 
         if wave_len > len(fade_out):
@@ -450,12 +449,12 @@ class WaveRNN(nn.Module):
         Args:
             y (ndarry)    : Batched sequences of audio samples
                             shape=(num_folds, target + 2 * overlap)
-                            dtype=np.float64
+                            dtype=np.float32
             overlap (int) : Timesteps for both xfade and rnn warmup
         Return:
             (ndarry) : audio samples in a 1d array
                        shape=(total_len)
-                       dtype=np.float64
+                       dtype=np.float32
         Details:
             y = [[seq1],
                  [seq2],
@@ -475,10 +474,10 @@ class WaveRNN(nn.Module):
         # Need some silence for the rnn warmup
         silence_len = overlap // 2
         fade_len = overlap - silence_len
-        silence = np.zeros((silence_len), dtype=np.float64)
+        silence = np.zeros((silence_len), dtype=np.float32)
 
         # Equal power crossfade
-        t = np.linspace(-1, 1, fade_len, dtype=np.float64)
+        t = np.linspace(-1, 1, fade_len, dtype=np.float32)
         fade_in = np.sqrt(0.5 * (1 + t))
         fade_out = np.sqrt(0.5 * (1 - t))
 
@@ -490,7 +489,7 @@ class WaveRNN(nn.Module):
         y[:, :overlap] *= fade_in
         y[:, -overlap:] *= fade_out
 
-        unfolded = np.zeros((total_len), dtype=np.float64)
+        unfolded = np.zeros((total_len), dtype=np.float32)
 
         # Loop to add up all the samples
         for i in range(num_folds):
@@ -19,17 +19,94 @@ def interpolate_vocoder_input(scale_factor, spec):
     Returns:
         torch.tensor: interpolated spectrogram.
     """
-    print(" > before interpolation :", spec.shape)
     spec = torch.tensor(spec).unsqueeze(0).unsqueeze(0)  # pylint: disable=not-callable
     spec = torch.nn.functional.interpolate(spec,
                                            scale_factor=scale_factor,
                                            recompute_scale_factor=True,
                                            mode='bilinear',
                                            align_corners=False).squeeze(0)
-    print(" > after interpolation :", spec.shape)
     return spec
 
 
+def _linear_interpolation_weights(in_size, out_size):
+    """Source indices and weights of a linear interpolation from ``in_size`` to
+    ``out_size`` points, as ``torch.nn.functional.interpolate`` with ``align_corners=False``."""
+    src = np.maximum((np.arange(out_size) + 0.5) * in_size / out_size - 0.5, 0)
+    idx0 = np.minimum(np.floor(src).astype(np.int64), in_size - 1)
+    idx1 = np.minimum(idx0 + 1, in_size - 1)
+    return idx0, idx1, (src - idx0).astype(np.float32)
+
+
+class VocoderInputAdapter(object):
+    def __init__(self, tts_ap, vocoder_ap, device='cpu'):
+        """Convert TTS model outputs to vocoder inputs on ``device``.
+
+        Denormalization with the TTS audio config and normalization with the
+        vocoder audio config are folded into one affine transform at load time.
+        Sample rate mismatches are handled by linear interpolation along time, and
+        different numbers of mel channels by a precomputed interpolation matrix.
+
+        Args:
+            tts_ap (AudioProcessor): audio processor of the TTS model.
+            vocoder_ap (AudioProcessor): audio processor of the vocoder model.
+            device (str, optional): device of the vocoder. Defaults to 'cpu'.
+        """
+        self.device = device
+        self.scale_factor = vocoder_ap.sample_rate / tts_ap.sample_rate
+        in_scale, in_shift, self.in_clip = tts_ap.normalization_params('mel')
+        out_scale, out_shift, self.out_clip = vocoder_ap.normalization_params('mel')
+        in_scale = np.broadcast_to(np.asarray(in_scale, dtype=np.float64), (tts_ap.num_mels, ))
+        in_shift = np.broadcast_to(np.asarray(in_shift, dtype=np.float64), (tts_ap.num_mels, ))
+        out_scale = np.broadcast_to(np.asarray(out_scale, dtype=np.float64), (vocoder_ap.num_mels, ))
+        out_shift = np.broadcast_to(np.asarray(out_shift, dtype=np.float64), (vocoder_ap.num_mels, ))
+        if tts_ap.num_mels == vocoder_ap.num_mels:
+            weight = np.diag(out_scale / in_scale)
+        else:
+            # denormalize, interpolate the channels, then normalize
+            idx0, idx1, w = _linear_interpolation_weights(tts_ap.num_mels, vocoder_ap.num_mels)
+            freq_weight = np.zeros((vocoder_ap.num_mels, tts_ap.num_mels))
+            np.add.at(freq_weight, (np.arange(vocoder_ap.num_mels), idx0), 1 - w)
+            np.add.at(freq_weight, (np.arange(vocoder_ap.num_mels), idx1), w)
+            weight = out_scale[:, None] * freq_weight / in_scale[None, :]
+        bias = out_shift - weight.dot(in_shift)
+        self.weight = torch.as_tensor(weight, dtype=torch.float32, device=device)
+        self.bias = torch.as_tensor(bias, dtype=torch.float32, device=device).view(1, -1, 1)
+
+    def __call__(self, specs):
+        """Convert a list of [T, C] TTS model outputs.
+
+        Returns:
+            Tuple[Tensor, List[int]]: zero padded vocoder input [B, C', T'] and the number of frames per sample.
+        """
+        lengths = [spec.shape[0] for spec in specs]
+        x = np.zeros((len(specs), max(lengths), specs[0].shape[1]), dtype=np.float32)
+        for idx, spec in enumerate(specs):
+            x[idx, :lengths[idx]] = spec
+        x = torch.from_numpy(x).to(self.device).transpose(1, 2)
+        if self.in_clip is not None:
+            x = x.clamp(*self.in_clip)
+        x = torch.matmul(self.weight, x) + self.bias
+        if self.out_clip is not None:
+            x = x.clamp(*self.out_clip)
+        if self.scale_factor != 1:
+            x, lengths = self._interpolate_time(x, lengths)
+        mask = torch.arange(x.shape[2], device=x.device).view(1, 1, -1) < torch.as_tensor(lengths, device=x.device).view(-1, 1, 1)
+        return x * mask.to(x.dtype), lengths
+
+    def _interpolate_time(self, x, lengths):
+        """Interpolate each sample along time on its own, matching ``interpolate_vocoder_input()``."""
+        out_lengths = [int(length * self.scale_factor) for length in lengths]
+        idx0 = np.zeros((len(lengths), max(out_lengths)), dtype=np.int64)
+        idx1 = np.zeros_like(idx0)
+        w = np.zeros(idx0.shape, dtype=np.float32)
+        for b, (length, out_length) in enumerate(zip(lengths, out_lengths)):
+            idx0[b, :out_length], idx1[b, :out_length], w[b, :out_length] = _linear_interpolation_weights(length, out_length)
+        idx0, idx1 = [torch.from_numpy(idx).to(x.device).unsqueeze(1).expand(-1, x.shape[1], -1) for idx in (idx0, idx1)]
+        w = torch.from_numpy(w).to(x.device).unsqueeze(1)
+        x = x.gather(2, idx0) * (1 - w) + x.gather(2, idx1) * w
+        return x, out_lengths
+
+
 def plot_results(y_hat, y, ap, global_step, name_prefix):
     """ Plot vocoder model results """
 
@@ -1,9 +1,19 @@
+import io
 import os
+import time
 import unittest
+import wave
+
+import numpy as np
+import soundfile as sf
+import torch
 
 from tests import get_tests_input_path, get_tests_output_path, get_tests_path
 
-from TTS.utils.audio import AudioProcessor
+import scipy.signal
+
+from TTS.utils import audio
+from TTS.utils.audio import AudioProcessor, read_audio, resample
 from TTS.utils.io import load_config
 
 TESTS_PATH = get_tests_path()
@@ -54,6 +64,49 @@ class TestAudio(unittest.TestCase):
         _test(4., True, False, True)
         _test(4., True, True, True)
 
+    def test_mel_basis_cache(self):
+        audio_config = dict(conf.audio)
+        audio_config.update({'stats_path': None, 'verbose': False})
+        aps = [AudioProcessor(**audio_config) for _ in range(20)]
+        # processors with the same parameters share the filterbanks and the window
+        for ap in aps:
+            assert ap.mel_basis is self.ap.mel_basis
+            assert ap.inv_mel_basis is self.ap.inv_mel_basis
+            assert ap.window is self.ap.window
+        audio_config['num_mels'] = 40
+        ap = AudioProcessor(**audio_config)
+        assert ap.mel_basis.shape == (40, self.ap.fft_size // 2 + 1)
+        assert ap.inv_mel_basis.shape == (self.ap.fft_size // 2 + 1, 40)
+
+    @unittest.skipUnless(os.environ.get('TTS_BENCHMARK'), 'set TTS_BENCHMARK=1 to run the benchmarks')
+    def test_mel_basis_cache_benchmark(self):
+        """Construction time of AudioProcessors computing their own filterbanks and
+        window, as before the cache, and sharing them. A server starts with two
+        processors, one for the tts model and one for the vocoder."""
+        audio_config = dict(conf.audio)
+        audio_config.update({'stats_path': None, 'verbose': False})
+
+        def _clear_caches():
+            for fn in [audio._cached_mel_basis, audio._cached_inv_mel_basis, audio._cached_window]:
+                fn.cache_clear()
+
+        num_processors = 20
+        start = time.time()
+        for _ in range(num_processors):
+            _clear_caches()
+            AudioProcessor(**audio_config)
+        uncached_time = (time.time() - start) / num_processors
+        _clear_caches()
+        AudioProcessor(**audio_config)
+        start = time.time()
+        for _ in range(num_processors):
+            AudioProcessor(**audio_config)
+        cached_time = (time.time() - start) / num_processors
+        print(" > AudioProcessor construction: {:.2f}ms uncached, {:.2f}ms cached".format(
+            uncached_time * 1000, cached_time * 1000))
+        print(" > server cold start (tts and vocoder processors): {:.2f}ms before, {:.2f}ms with the cache".format(
+            2 * uncached_time * 1000, (uncached_time + cached_time) * 1000))
+
     def test_normalize(self):
         """Check normalization and denormalization for range values and consistency """
         print(" > Testing normalization and denormalization.")
@@ -174,3 +227,144 @@ class TestAudio(unittest.TestCase):
         mel_norm = ap.melspectrogram(wav)
         mel_denorm = ap.denormalize(mel_norm)
         assert abs(mel_reference - mel_denorm).max() < 1e-4
+
+    def test_spectrograms_torch(self):
+        def _test(ap):
+            wav = ap.load_wav(WAV_FILE).astype(np.float32)
+            wavs = [wav, wav[:len(wav) // 2], wav[1000:len(wav) // 3]]
+            padded = np.stack([np.pad(w, (0, len(wav) - len(w))) for w in wavs])
+            mel, linear, lengths = ap.spectrograms_torch(torch.from_numpy(padded), [len(w) for w in wavs],
+                                                         compute_linear=not hasattr(ap, 'mel_scaler'))
+            assert mel.shape[:2] == (3, ap.num_mels)
+            for idx, w in enumerate(wavs):
+                mel_ref = ap.melspectrogram(w)
+                assert lengths[idx] == mel_ref.shape[1]
+                assert abs(mel[idx, :, :lengths[idx]].numpy() - mel_ref).max() < 1e-3
+                # padded frames are zero
+                assert mel[idx, :, lengths[idx]:].abs().sum() == 0
+                if linear is not None:
+                    assert abs(linear[idx, :, :lengths[idx]].numpy() - ap.spectrogram(w)).max() < 1e-3
+
+        audio_config = dict(conf.audio)
+        audio_config.update({'stats_path': None, 'preemphasis': 0.97, 'signal_norm': True, 'symmetric_norm': True,
+                             'clip_norm': True, 'do_trim_silence': False})
+        _test(AudioProcessor(**audio_config))
+        audio_config.update({'preemphasis': 0.0, 'symmetric_norm': False})
+        _test(AudioProcessor(**audio_config))
+        audio_config.update({'symmetric_norm': True,
+                             'stats_path': os.path.join(get_tests_input_path(), 'scale_stats.npy')})
+        _test(AudioProcessor(**audio_config))
+
+    def test_griffin_lim_batch(self):
+        audio_config = dict(conf.audio)
+        audio_config.update({'stats_path': None, 'griffin_lim_iters': 10, 'griffin_lim_momentum': 0.99,
+                             'stft_backend': 'torch', 'do_trim_silence': False})
+        ap = AudioProcessor(**audio_config)
+        wav = ap.load_wav(WAV_FILE)
+        mel = ap.melspectrogram(wav)
+        lengths = [mel.shape[1], mel.shape[1] // 2]
+        mels = np.stack([mel, np.pad(mel[:, :lengths[1]], ((0, 0), (0, lengths[0] - lengths[1])))])
+        wavs = ap.inv_melspectrogram_batch(mels, lengths)
+        assert wavs.shape == (2, (mel.shape[1] - 1) * ap.hop_length)
+        assert wavs.dtype == np.float32
+        # padded frames are silent
+        assert abs(wavs[1, lengths[1] * ap.hop_length + ap.fft_size:]).max() < 1e-4
+        # the single sample path uses the same implementation
+        wav_ = ap.inv_melspectrogram(mel)
+        assert wav_.shape == wavs[0].shape
+        linear = ap.spectrogram(wav)
+        assert ap.inv_spectrogram_batch(linear[None]).shape == (1, (linear.shape[1] - 1) * ap.hop_length)
+
+    def test_find_endpoint(self):
+        def _find_endpoint_loop(wav, threshold_db=-40, min_silence_sec=0.8):
+            window_length = int(self.ap.sample_rate * min_silence_sec)
+            hop_length = int(window_length / 4)
+            threshold = self.ap._db_to_amp(threshold_db)
+            for x in range(hop_length, len(wav) - window_length, hop_length):
+                if np.max(wav[x:x + window_length]) < threshold:
+                    return x + hop_length
+            return len(wav)
+
+        wav = self.ap.load_wav(WAV_FILE)
+        silence = np.zeros(self.ap.sample_rate * 2)
+        for signal in [wav, np.concatenate([wav, silence, wav]), np.concatenate([silence, wav]), wav[:1000]]:
+            for min_silence_sec in [0.8, 0.33]:
+                endpoint = _find_endpoint_loop(signal, min_silence_sec=min_silence_sec)
+                assert self.ap.find_endpoint(signal, min_silence_sec=min_silence_sec) == endpoint
+                # streaming with uneven chunks gives the same endpoint
+                detector = self.ap.endpoint_detector(min_silence_sec=min_silence_sec)
+                for offset in range(0, len(signal), 3001):
+                    if detector.push(signal[offset:offset + 3001]) is not None:
+                        break
+                assert detector.finish() == endpoint
+
+    def test_stream_spectrograms(self):
+        audio_config = dict(conf.audio)
+        audio_config.update({'stats_path': None, 'preemphasis': 0.97, 'do_trim_silence': False, 'verbose': False})
+        ap = AudioProcessor(**audio_config)
+        wav = ap.load_wav(WAV_FILE)
+        mel = ap.melspectrogram(wav)
+        linear = ap.spectrogram(wav)
+        # block sizes not aligned with the hop length
+        for block_size in [ap.fft_size, 5000, len(wav) + 1]:
+            blocks = list(ap.stream_spectrograms(WAV_FILE, block_size=block_size, compute_linear=True))
+            mel_ = np.concatenate([b[0] for b in blocks], axis=1)
+            linear_ = np.concatenate([b[1] for b in blocks], axis=1)
+            assert mel_.shape == mel.shape
+            assert abs(mel_ - mel).max() < 1e-4
+            assert abs(linear_ - linear).max() < 1e-4
+        # stereo files are downmixed as by read_audio()
+        stereo_file = os.path.join(OUT_PATH, "stereo.wav")
+        sf.write(stereo_file, np.stack([wav, 0.5 * wav], axis=1), ap.sample_rate, subtype='FLOAT')
+        mel = ap.melspectrogram(read_audio(stereo_file)[0])
+        mel_ = np.concatenate([b[0] for b in ap.stream_spectrograms(stereo_file, block_size=5000)], axis=1)
+        assert mel_.shape == mel.shape
+        assert abs(mel_ - mel).max() < 1e-4
+
+    def test_resample(self):
+        wav, sr = read_audio(WAV_FILE)
+        assert sr == self.ap.sample_rate
+        for target_sr in [16000, 24000, sr]:
+            wav_ = resample(wav, sr, target_sr)
+            assert abs(len(wav_) - len(wav) * target_sr / sr) <= 1
+            if target_sr != sr:
+                # same output as resample_poly with its default filter
+                gcd = np.gcd(sr, target_sr)
+                assert np.allclose(wav_, scipy.signal.resample_poly(wav, target_sr // gcd, sr // gcd))
+        wav_16k, sr_16k = read_audio(WAV_FILE, sr=16000)
+        assert sr_16k == 16000 and wav_16k.dtype == np.float32
+        audio_config = dict(conf.audio)
+        audio_config.update({'stats_path': None, 'resample': True, 'sample_rate': 16000, 'mel_fmax': 7600,
+                             'do_trim_silence': False, 'verbose': False})
+        assert len(AudioProcessor(**audio_config).load_wav(WAV_FILE)) == len(wav_16k)
+
+    def test_wav_header(self):
+        wav = self.ap.load_wav(WAV_FILE)
+        pcm = self.ap.encode_16bits(wav).tobytes()
+        header = self.ap.wav_header(self.ap.sample_rate, num_samples=len(wav))
+        assert len(header) == 44
+        with wave.open(io.BytesIO(header + pcm)) as f:
+            assert f.getframerate() == self.ap.sample_rate
+            assert f.getsampwidth() == 2
+            assert f.getnframes() == len(wav)
+
+    def test_float32_pipeline(self):
+        audio_config = dict(conf.audio)
+        audio_config.update({'preemphasis': 0.97, 'griffin_lim_iters': 2, 'use_float32': True, 'verbose': False})
+        ap = AudioProcessor(**audio_config)
+        ap_ref = AudioProcessor(**dict(audio_config, use_float32=False))
+        wav = ap.load_wav(WAV_FILE)
+        assert wav.dtype == np.float32
+        assert ap.apply_preemphasis(wav).dtype == np.float32
+        assert ap.apply_inv_preemphasis(wav).dtype == np.float32
+        mel = ap.melspectrogram(wav)
+        linear = ap.spectrogram(wav)
+        assert mel.dtype == np.float32 and linear.dtype == np.float32
+        assert np.allclose(mel, ap_ref.melspectrogram(ap_ref.load_wav(WAV_FILE)), atol=1e-3)
+        assert ap.inv_melspectrogram(mel).dtype == np.float32
+        assert ap.inv_spectrogram(linear).dtype == np.float32
+        assert ap.out_linear_to_mel(linear).dtype == np.float32
+        # float64 inputs are cast
+        assert ap.melspectrogram(wav.astype(np.float64)).dtype == np.float32
+        for mel, linear in ap.stream_spectrograms(WAV_FILE, compute_linear=True):
+            assert mel.dtype == np.float32 and linear.dtype == np.float32
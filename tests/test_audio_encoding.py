@@ -0,0 +1,83 @@
+import io
+import os
+import unittest
+import wave
+
+import numpy as np
+import soundfile as sf
+
+from tests import get_tests_input_path
+from TTS.utils.audio import AudioProcessor
+from TTS.utils.audio_encoding import AudioEncoder, pcm16_to_mulaw
+from TTS.utils.io import load_config
+
+WAV_FILE = os.path.join(get_tests_input_path(), "example_1.wav")
+conf = load_config(os.path.join(get_tests_input_path(), 'test_config.json'))
+
+
+class TestAudioEncoding(unittest.TestCase):
+    def __init__(self, *args, **kwargs):
+        super(TestAudioEncoding, self).__init__(*args, **kwargs)
+        self.ap = AudioProcessor(**conf.audio, verbose=False)
+        self.wav = self.ap.load_wav(WAV_FILE).astype(np.float32)
+
+    def _chunks(self):
+        # chunk edges at arbitrary positions
+        return np.array_split(self.wav, 5)
+
+    def _encode_chunks(self, encoder):
+        data = [encoder.header()] + [encoder.encode(chunk) for chunk in self._chunks()] + [encoder.finish()]
+        return b''.join(data)
+
+    def test_mulaw(self):
+        pcm = np.arange(-32768, 32768, dtype=np.int16)
+        ulaw = pcm16_to_mulaw(pcm)
+        assert ulaw.dtype == np.uint8
+        assert ulaw[32768] == 0xFF  # zero
+        assert ulaw[-1] == 0x80 and ulaw[0] == 0x00  # max and min
+        try:
+            import audioop  # pylint: disable=import-outside-toplevel
+        except ImportError:
+            return
+        assert ulaw.tobytes() == audioop.lin2ulaw(pcm.astype('<i2').tobytes(), 2)
+
+    def test_wav(self):
+        encoder = AudioEncoder('wav', self.ap.sample_rate)
+        data = encoder.encode_all(self.wav)
+        with wave.open(io.BytesIO(data)) as f:
+            assert f.getframerate() == self.ap.sample_rate
+            assert f.getnframes() == len(self.wav)
+            pcm = np.frombuffer(f.readframes(f.getnframes()), dtype='<i2')
+        assert np.array_equal(pcm, AudioProcessor.encode_16bits(self.wav))
+        # streamed chunks only differ in the size fields of the header
+        streamed = self._encode_chunks(AudioEncoder('wav', self.ap.sample_rate))
+        assert streamed[44:] == data[44:]
+
+    def test_resampled_formats(self):
+        for output_format, sample_rate, sample_width in [('pcm', 16000, 2), ('mulaw', None, 1)]:
+            encoder = AudioEncoder(output_format, self.ap.sample_rate, sample_rate)
+            data = self._encode_chunks(encoder)
+            num_samples = len(data) // sample_width
+            expected = len(self.wav) * encoder.target_sample_rate / self.ap.sample_rate
+            # chunks are resampled one by one
+            assert abs(num_samples - expected) <= len(self._chunks())
+        assert AudioEncoder('mulaw', self.ap.sample_rate).target_sample_rate == 8000
+
+    def test_ogg(self):
+        if 'OPUS' not in sf.available_subtypes('OGG'):
+            with self.assertRaises(ValueError):
+                AudioEncoder('ogg', self.ap.sample_rate)
+            return
+        encoder = AudioEncoder('ogg', self.ap.sample_rate)
+        assert encoder.target_sample_rate == 24000
+        data = self._encode_chunks(encoder)
+        assert data[:4] == b'OggS'
+        wav, sr = sf.read(io.BytesIO(data))
+        assert sr == 24000
+        assert abs(len(wav) - len(self.wav) * sr / self.ap.sample_rate) < 0.1 * sr
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            AudioEncoder('mp3', self.ap.sample_rate)
+        with self.assertRaises(ValueError):
+            AudioEncoder('ogg', self.ap.sample_rate, 22050)
@@ -1,7 +1,13 @@
 import os
+import resource
+import time
+import tracemalloc
 import unittest
 
+import numpy as np
+
 from tests import get_tests_input_path, get_tests_output_path
+from TTS.server.batching import BatchScheduler
 from TTS.utils.synthesizer import Synthesizer
 from TTS.tts.utils.generic_utils import setup_model
 from TTS.tts.utils.io import save_checkpoint
@@ -31,6 +37,62 @@ class DemoServerTest(unittest.TestCase):
         config['tts_config'] = os.path.join(tts_root_path, config['tts_config'])
         synthesizer = Synthesizer(config['tts_checkpoint'], config['tts_config'], None, None)
         synthesizer.tts("Better this test works!!")
+        chunks = list(synthesizer.tts_stream("Better this test works!! And this one, too, works.", max_chars=20))
+        assert len(chunks) > 2
+        assert all(chunk.dtype == np.float32 for chunk in chunks)
+        assert sum(len(chunk) for chunk in chunks) > 0
+        wav = synthesizer.encode(synthesizer.tts("Better this test works!!"), synthesizer.audio_encoder())
+        assert wav[:4] == b'RIFF'
+        ulaw = b''.join(synthesizer.tts_stream_encoded("Better this test works!!", synthesizer.audio_encoder('mulaw')))
+        assert len(ulaw) > 0
+        # batched requests of the scheduler thread and a stream share the models
+        scheduler = BatchScheduler(synthesizer.tts_batch, max_batch_size=4, max_wait_ms=10)
+        futures = [scheduler.submit(["Better this test works!!", "And this one."]) for _ in range(3)]
+        assert len(list(synthesizer.tts_stream("Better this test works!! And this one, too."))) > 0
+        for future in futures:
+            assert len(future.result(timeout=60)) == 2
+
+    @unittest.skipUnless(os.environ.get('TTS_BENCHMARK'), 'set TTS_BENCHMARK=1 to run the benchmarks')
+    def test_merge_sentences_benchmark(self):
+        """Wall time and peak memory of assembling 10 minutes of 22.05kHz sentence
+        waveforms as a list of floats, as before, and with ``merge_sentences()``."""
+        # pylint: disable=attribute-defined-outside-init
+        self.silence_length = 10000
+        sample_rate = 22050
+        sentence_wavs = [np.random.uniform(-1, 1, sample_rate * 5).astype(np.float32) for _ in range(120)]
+
+        def _list_merge():
+            wavs = []
+            for waveform in sentence_wavs:
+                wavs += list(waveform)
+                wavs += [0] * self.silence_length
+            return np.array(wavs)
+
+        def _measure(merge_fn):
+            tracemalloc.start()
+            start = time.time()
+            wav = merge_fn()
+            duration = time.time() - start
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            return wav, duration, peak
+
+        # the float32 path first, so that the max RSS after it is not raised by the list path
+        wav, duration, peak = _measure(lambda: Synthesizer.merge_sentences(self, sentence_wavs))
+        print(f" > merge_sentences: {duration:.3f}s, peak {peak / 2**20:.1f}MB traced, "
+              f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10:.1f}MB")
+        ref_wav, ref_duration, ref_peak = _measure(_list_merge)
+        print(f" > list of floats: {ref_duration:.3f}s, peak {ref_peak / 2**20:.1f}MB traced, "
+              f"max RSS {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 2**10:.1f}MB")
+        print(f" > {len(wav) / sample_rate / 60:.1f} minutes of audio")
+        assert wav.dtype == np.float32
+        assert np.array_equal(wav, ref_wav.astype(np.float32))
+
+    def test_split_long_sentence(self):
+        sls = Synthesizer.split_long_sentence
+        assert sls(self, 'short one.', 20) == ['short one.']
+        assert sls(self, 'short one.', None) == ['short one.']
+        assert sls(self, 'first clause, second clause; third clause.', 20) == ['first clause,', 'second clause;', 'third clause.']
 
     def test_split_into_sentences(self):
         """Check demo server sentences split as expected"""
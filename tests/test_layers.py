@@ -70,6 +70,40 @@ class DecoderTests(unittest.TestCase):
         assert output.shape[2] == 2, "size not {}".format(output.shape[2])
         assert stop_tokens.shape[0] == 4
 
+    @staticmethod
+    def test_inference_batch():
+        layer = Decoder(
+            in_channels=256,
+            frame_channels=80,
+            r=2,
+            memory_size=4,
+            attn_windowing=False,
+            attn_norm="sigmoid",
+            attn_K=5,
+            attn_type="original",
+            prenet_type='original',
+            prenet_dropout=True,
+            forward_attn=False,
+            trans_agent=False,
+            forward_attn_mask=False,
+            location_attn=True,
+            separate_stopnet=True)
+        layer.eval()
+        layer.max_decoder_steps = 10
+        dummy_input = T.rand(4, 8, 256)
+        mask = sequence_mask(T.LongTensor([8, 7, 5, 3]))
+
+        output, alignment, stop_tokens, output_lengths = layer.inference_batch(
+            dummy_input, mask=mask)
+
+        assert output.shape[0] == 4
+        assert output.shape[1] == 80, "size not {}".format(output.shape[1])
+        assert output_lengths.shape[0] == 4
+        assert output_lengths.max() == output.shape[2]
+        assert (output_lengths % 2 == 0).all()
+        # no attention on padded inputs
+        assert alignment[3, :, 3:].max() < 1e-3
+
 class EncoderTests(unittest.TestCase):
     def test_in_out(self):  #pylint: disable=no-self-use
         layer = Encoder(128)
@@ -3,12 +3,15 @@ import shutil
 import unittest
 
 import numpy as np
+import soundfile as sf
 import torch
 from tests import get_tests_input_path, get_tests_output_path
 from torch.utils.data import DataLoader
 
 from TTS.tts.datasets import TTSDataset
+from TTS.tts.datasets.feature_store import build_feature_store
 from TTS.tts.datasets.preprocess import ljspeech
+from TTS.tts.utils.data import prepare_data, prepare_stop_target, prepare_tensor
 from TTS.utils.audio import AudioProcessor
 from TTS.utils.io import load_config
 
@@ -26,6 +29,47 @@ if not os.path.exists(c.data_path):
 print(" > Dynamic data loader test: {}".format(DATA_EXIST))
 
 
+class TestCollate(unittest.TestCase):
+    def test_collate_fn(self):
+        """Compare with padding every item with np.pad"""
+        ap = AudioProcessor(**c.audio)
+        r = 3
+        dataset = TTSDataset.MyDataset(r, c.text_cleaner, compute_linear_spec=True, ap=ap, meta_data=[],
+                                       use_phonemes=False)
+        rng = np.random.RandomState(0)
+        batch = []
+        for text_length, mel_length in [(7, 20), (12, 31), (9, 17), (12, 5)]:
+            batch.append({
+                'text': rng.randint(1, 50, size=text_length).astype(np.int32),
+                'wav': None,
+                'mel': rng.rand(mel_length, ap.num_mels).astype(np.float32),
+                'linear': rng.rand(mel_length, ap.fft_size // 2 + 1).astype(np.float32),
+                'attn': rng.rand(mel_length, text_length).astype(np.float32),
+                'item_idx': str(mel_length),
+                'speaker_name': 'speaker',
+                'wav_file_name': str(mel_length),
+            })
+        text, text_lengths, _, linear, mel, mel_lengths, stop_targets, item_idxs, _, attns = dataset.collate_fn(batch)
+        order = [1, 3, 2, 0]  # decreasing text length
+        assert item_idxs == [batch[idx]['item_idx'] for idx in order]
+        batch = [batch[idx] for idx in order]
+        assert text_lengths.tolist() == [12, 12, 9, 7]
+        assert np.array_equal(text.numpy(), prepare_data([d['text'] for d in batch]))
+        assert mel_lengths.tolist() == [31, 5, 17, 20]
+        assert mel.shape[1] == 33
+        ref_mel = prepare_tensor([d['mel'].T for d in batch], r).transpose(0, 2, 1)
+        assert np.array_equal(mel.numpy(), ref_mel)
+        ref_linear = prepare_tensor([d['linear'].T for d in batch], r).transpose(0, 2, 1)
+        assert np.array_equal(linear.numpy(), ref_linear)
+        ref_stop_targets = prepare_stop_target([np.array([0.] * (d['mel'].shape[0] - 1) + [1.]) for d in batch], r)
+        assert np.array_equal(stop_targets.numpy(), ref_stop_targets)
+        assert attns.shape == (4, 1, 12, 33)
+        for idx, d in enumerate(batch):
+            attn = d['attn'].T
+            assert np.array_equal(attns[idx, 0, :attn.shape[0], :attn.shape[1]].numpy(), attn)
+            assert np.isclose(attns[idx].sum().item(), attn.sum(), rtol=1e-5)
+
+
 class TestTTSDataset(unittest.TestCase):
     def __init__(self, *args, **kwargs):
         super(TestTTSDataset, self).__init__(*args, **kwargs)
@@ -209,3 +253,82 @@ class TestTTSDataset(unittest.TestCase):
                 # check batch zero-frame conditions (zero-frame disabled)
                 # assert (linear_input * stop_target.unsqueeze(2)).sum() == 0
                 # assert (mel_input * stop_target.unsqueeze(2)).sum() == 0
+
+    def test_feature_store(self):
+        if ok_ljspeech:
+            store_path = os.path.join(OUTPATH, 'feature_store')
+
+            def _create_dataset(feature_store_path=None):
+                items = ljspeech(c.data_path, 'metadata.csv')[:6]
+                return TTSDataset.MyDataset(1, c.text_cleaner, compute_linear_spec=True, ap=self.ap, meta_data=items,
+                                            tp=c.characters if 'characters' in c.keys() else None,
+                                            use_phonemes=False, feature_store_path=feature_store_path)
+
+            dataset = _create_dataset()
+            # small shards to have items in several of them
+            build_feature_store(dataset, store_path, shard_size=2**18)
+            store_dataset = _create_dataset(store_path)
+            assert len(store_dataset.feature_store.fields['mel']['shard']) == 6
+            assert store_dataset.feature_store.fields['mel']['shard'].max() > 0
+            for idx in range(len(dataset)):
+                sample = store_dataset[idx]
+                assert sample['wav'] is None
+                assert np.array_equal(sample['text'], dataset[idx]['text'])
+            batch = dataset.collate_fn([dataset[idx] for idx in range(3)])
+            store_batch = store_dataset.collate_fn([store_dataset[idx] for idx in range(3)])
+            for idx in [0, 1, 5]:
+                assert torch.equal(batch[idx], store_batch[idx])
+            for idx in [3, 4, 6]:
+                assert torch.allclose(batch[idx], store_batch[idx], atol=1e-5)
+
+    def test_feature_store_attention_masks(self):
+        if ok_ljspeech:
+            store_path = os.path.join(OUTPATH, 'feature_store_attn')
+            attn_path = os.path.join(OUTPATH, 'attn_masks')
+            os.makedirs(attn_path, exist_ok=True)
+            items = ljspeech(c.data_path, 'metadata.csv')[:3]
+            for idx, item in enumerate(items):
+                attn_file = os.path.join(attn_path, f'{idx}.npy')
+                np.save(attn_file, np.random.rand(5 + idx, 3).astype(np.float32))
+                item.append(attn_file)
+
+            def _create_dataset(meta_data, feature_store_path=None):
+                return TTSDataset.MyDataset(1, c.text_cleaner, compute_linear_spec=False, ap=self.ap,
+                                            meta_data=meta_data, tp=c.characters if 'characters' in c.keys() else None,
+                                            use_phonemes=False, feature_store_path=feature_store_path)
+
+            dataset = _create_dataset(items)
+            build_feature_store(dataset, store_path)
+            attns = [dataset[idx]['attn'] for idx in range(len(dataset))]
+            # training reads the stored masks, not the .npy files
+            shutil.rmtree(attn_path)
+            store_dataset = _create_dataset(items, store_path)
+            for idx, attn in enumerate(attns):
+                assert np.array_equal(store_dataset[idx]['attn'], attn)
+            # a store built without attention masks is rejected
+            build_feature_store(_create_dataset([item[:3] for item in items]), store_path)
+            with self.assertRaises(AssertionError):
+                _create_dataset(items, store_path)
+
+    def test_sort_items(self):
+        if ok_ljspeech:
+            items = ljspeech(c.data_path, 'metadata.csv')
+            text_lengths = {item[1]: len(item[0]) for item in items}
+            max_seq_len = int(np.median(list(text_lengths.values())))
+            dataset = TTSDataset.MyDataset(1, c.text_cleaner, compute_linear_spec=False, ap=self.ap, meta_data=items,
+                                           tp=c.characters if 'characters' in c.keys() else None,
+                                           max_seq_len=max_seq_len, use_phonemes=False)
+            # durations read from the file headers in parallel or given by the dataset index
+            mel_lengths = dataset.mel_lengths(num_workers=2)
+            durations = {item[1]: sf.info(item[1]).duration for item in items}
+            index_dataset = TTSDataset.MyDataset(1, c.text_cleaner, compute_linear_spec=False, ap=self.ap,
+                                                 meta_data=items, audio_durations=durations, use_phonemes=False)
+            assert np.array_equal(index_dataset.mel_lengths(), mel_lengths)
+            wav = self.ap.load_wav(items[0][1])
+            assert mel_lengths[0] == len(wav) // self.ap.hop_length + 1
+            # sorted by mel length and filtered by text length, neither decoding nor converting texts
+            dataset.sort_items()
+            assert len(dataset) == sum(length <= max_seq_len for length in text_lengths.values())
+            assert all(text_lengths[item[1]] <= max_seq_len for item in dataset.items)
+            assert (np.diff(dataset.mel_lengths()) >= 0).all()
+            assert all(isinstance(item[0], str) for item in dataset.items)
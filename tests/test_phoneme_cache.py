@@ -0,0 +1,80 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import numpy as np
+
+from TTS.tts.datasets.phoneme_sequence_cache import PhonemeSequenceCache
+from TTS.tts.utils.text.phoneme_cache import PhonemeCache
+
+
+class PhonemeCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.out_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.out_path, ignore_errors=True)
+
+    def test_lru(self):  # pylint: disable=no-self-use
+        cache = PhonemeCache(max_size=2)
+        key_a = PhonemeCache.make_key("a", ["phoneme_cleaners"], "en-us")
+        key_b = PhonemeCache.make_key("b", ["phoneme_cleaners"], "en-us")
+        key_c = PhonemeCache.make_key("c", ["phoneme_cleaners"], "en-us")
+        assert cache.get(key_a) is None
+        cache.set(key_a, "ɐ")
+        cache.set(key_b, "biː")
+        assert cache.get(key_a) == "ɐ"
+        # b is the least recently used entry
+        cache.set(key_c, "siː")
+        assert cache.get(key_b) is None
+        assert cache.get(key_c) == "siː"
+        assert cache.stats() == {'size': 2, 'hits': 2, 'store_hits': 0, 'misses': 2}
+        # keys depend on the cleaners and the language
+        assert key_a != PhonemeCache.make_key("a", ["english_cleaners"], "en-us")
+        assert key_a != PhonemeCache.make_key("a", ["phoneme_cleaners"], "en-gb")
+
+    def test_store(self):
+        db_path = os.path.join(self.out_path, "phonemes.db")
+        key = PhonemeCache.make_key("hello", ["phoneme_cleaners"], "en-us")
+        PhonemeCache(db_path=db_path).set(key, "həloʊ")
+        # a new cache, e.g. after a restart or in another worker, reads the store
+        cache = PhonemeCache(db_path=db_path)
+        assert cache.get(key) == "həloʊ"
+        assert cache.get(key) == "həloʊ"
+        assert cache.stats()['store_hits'] == 1
+        assert cache.stats()['hits'] == 1
+
+
+class PhonemeSequenceCacheTest(unittest.TestCase):
+    def setUp(self):
+        self.out_path = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.out_path, ignore_errors=True)
+
+    def test_append_and_reload(self):
+        path = os.path.join(self.out_path, "phonemes.bin")
+        key_a = PhonemeSequenceCache.make_key("a", ["phoneme_cleaners"], "en-us", False)
+        key_b = PhonemeSequenceCache.make_key("b", ["phoneme_cleaners"], "en-us", False)
+        # keys depend on add_blank
+        assert key_a != PhonemeSequenceCache.make_key("a", ["phoneme_cleaners"], "en-us", True)
+        cache = PhonemeSequenceCache(path)
+        other_cache = PhonemeSequenceCache(path)
+        assert cache.get(key_a) is None
+        cache.add([(key_a, [1, 2, 3])])
+        # a writer that has not seen the first record
+        other_cache.add([(key_b, np.array([4, 5], dtype=np.int32))])
+        assert key_a in other_cache and other_cache.get(key_a).tolist() == [1, 2, 3]
+        cache = PhonemeSequenceCache(path)
+        assert len(cache) == 2
+        assert cache.get(key_b).tolist() == [4, 5]
+        # an incomplete record is ignored on load and cut by the next append
+        with open(path, 'ab') as f:
+            f.write(b'\x00' * 10)
+        cache = PhonemeSequenceCache(path)
+        assert len(cache) == 2
+        key_c = PhonemeSequenceCache.make_key("c", ["phoneme_cleaners"], "en-us", False)
+        other_cache.add([(key_c, [6])])
+        cache = PhonemeSequenceCache(path)
+        assert len(cache) == 3 and cache.get(key_c).tolist() == [6]
@@ -1,8 +1,10 @@
+import shutil
 import unittest
 import os
-from tests import get_tests_input_path
+from tests import get_tests_input_path, get_tests_output_path, get_tests_path
 
-from TTS.tts.datasets.preprocess import common_voice
+from TTS.tts.datasets.dataset_index import DatasetIndex, dataset_index_key
+from TTS.tts.datasets.preprocess import common_voice, load_dataset_indices, load_meta_data
 
 
 class TestPreprocessors(unittest.TestCase):
@@ -16,3 +18,50 @@ class TestPreprocessors(unittest.TestCase):
 
         assert items[-1][0] == "Competition for limited resources has also resulted in some local conflicts."
         assert items[-1][1] == os.path.join(get_tests_input_path(), "clips", "common_voice_en_19737074.wav")
+
+    def test_dataset_index_cache(self):  #pylint: disable=no-self-use
+        data_path = os.path.join(get_tests_path(), "data", "ljspeech")
+        cache_path = os.path.join(get_tests_output_path(), "dataset_index_tests")
+        shutil.rmtree(cache_path, ignore_errors=True)
+        datasets = [{"name": "ljspeech", "path": data_path, "meta_file_train": "metadata.csv",
+                     "meta_file_val": "metadata.csv"},
+                    {"name": "common_voice", "path": get_tests_input_path(), "meta_file_train": "common_voice.tsv",
+                     "meta_file_val": "common_voice.tsv"}]
+        # cold cache, preprocessors in a pool
+        train_items, eval_items = load_meta_data(datasets, cache_path=cache_path, num_workers=2)
+        assert len(os.listdir(cache_path)) == 2
+        index = load_dataset_indices(datasets, cache_path)[0]
+        assert index.items[0][1] == os.path.join(data_path, "wavs", "LJ001-0001.wav")
+        assert index.speaker_names == ["ljspeech"]
+        assert (index.durations > 0).all() and (index.file_sizes > 0).all()
+        # warm cache gives the same items
+        cached_train_items, cached_eval_items = load_meta_data(datasets, cache_path=cache_path)
+        assert cached_train_items == train_items and cached_eval_items == eval_items
+        assert load_meta_data(datasets) == (train_items, eval_items)
+        # without a cache the audio files are not read unless asked for
+        assert (load_dataset_indices(datasets, read_stats=False)[0].durations == -1).all()
+        # missing files and None texts are stored too
+        items = [[None, "missing.wav", "speaker"], ["text", os.path.join(get_tests_input_path(), "example_1.wav"), "é"]]
+        index = DatasetIndex(items, [0, 1], [-1, 10], [-1.0, 1.5])
+        index.save(os.path.join(cache_path, "index.npz"))
+        loaded_index = DatasetIndex.load(os.path.join(cache_path, "index.npz"))
+        assert loaded_index.items == items
+        assert loaded_index.splits.tolist() == [0, 1] and loaded_index.durations.tolist() == [-1.0, 1.5]
+
+    def test_dataset_index_key(self):  #pylint: disable=no-self-use
+        root_path = os.path.join(get_tests_output_path(), "dataset_index_key_tests")
+        shutil.rmtree(root_path, ignore_errors=True)
+        os.makedirs(os.path.join(root_path, "wav48", "p225"))
+        with open(os.path.join(root_path, "metadata.csv"), "w") as f:
+            f.write("p225_001|text\n")
+        dataset = {"name": "vctk", "path": root_path, "meta_file_train": "metadata.csv", "meta_file_val": None}
+        key = dataset_index_key(dataset)
+        assert dataset_index_key(dataset) == key
+        # a new file two levels below the dataset path
+        open(os.path.join(root_path, "wav48", "p225", "p225_001.wav"), "wb").close()
+        new_key = dataset_index_key(dataset)
+        assert new_key != key
+        # a meta file rewritten in place
+        with open(os.path.join(root_path, "metadata.csv"), "a") as f:
+            f.write("p225_002|more text\n")
+        assert dataset_index_key(dataset) != new_key
@@ -0,0 +1,42 @@
+import unittest
+
+import numpy as np
+
+from TTS.tts.datasets.sampler import BucketBatchSampler, padding_ratio
+
+
+class TestBucketBatchSampler(unittest.TestCase):
+    def setUp(self):
+        self.lengths = np.random.RandomState(0).randint(50, 1000, size=500)
+
+    def test_batches(self):
+        sampler = BucketBatchSampler(self.lengths, max_frames=4000, bucket_size=50)
+        batches = list(sampler)
+        assert len(batches) == len(sampler)
+        assert sorted(idx for batch in batches for idx in batch) == list(range(len(self.lengths)))
+        for batch in batches:
+            assert len(batch) * self.lengths[batch].max() <= 4000
+        # less padding than batches of random items
+        ratios = [padding_ratio(self.lengths[batch], self.lengths[batch].max()) for batch in batches]
+        random_batches = np.array_split(np.arange(len(self.lengths)), len(batches))
+        random_ratios = [padding_ratio(self.lengths[batch], self.lengths[batch].max()) for batch in random_batches]
+        assert np.mean(ratios) < np.mean(random_ratios)
+        # new batches every epoch
+        assert list(sampler) != batches
+
+    def test_max_batch_size_and_long_items(self):
+        sampler = BucketBatchSampler(self.lengths, max_frames=500, max_batch_size=3, shuffle=False)
+        batches = list(sampler)
+        assert batches == list(sampler)
+        assert all(len(batch) <= 3 for batch in batches)
+        # items longer than the budget are alone in their batch
+        assert all(len(batch) == 1 for batch in batches if self.lengths[batch].max() > 500)
+
+    def test_distributed(self):
+        samplers = [BucketBatchSampler(self.lengths, max_frames=4000, num_replicas=3, rank=rank) for rank in range(3)]
+        batches = [list(sampler) for sampler in samplers]
+        assert len(batches[0]) == len(batches[1]) == len(batches[2])
+        all_items = [idx for replica_batches in batches for batch in replica_batches for idx in batch]
+        assert set(all_items) == set(range(len(self.lengths)))
+        # replicas see different batches
+        assert batches[0][0] != batches[1][0]
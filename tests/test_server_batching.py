@@ -0,0 +1,114 @@
+import queue
+import threading
+import time
+import unittest
+
+from TTS.server.batching import BatchScheduler
+
+
+class BatchSchedulerTest(unittest.TestCase):
+    def test_batches_concurrent_requests(self):
+        calls = []
+
+        def synthesize_fn(sentences, speaker_idx):
+            calls.append((list(sentences), speaker_idx))
+            return [sen.upper() for sen in sentences]
+
+        scheduler = BatchScheduler(synthesize_fn, max_batch_size=4, max_wait_ms=200)
+        requests = [['a b c.', 'd.'], ['e f.'], ['g.']]
+        results = [None] * len(requests)
+
+        def _submit(idx):
+            results[idx] = scheduler.submit(requests[idx]).result(timeout=5)
+
+        threads = [threading.Thread(target=_submit, args=(idx,)) for idx in range(len(requests))]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        # every request gets its own sentences back in order
+        for request, result in zip(requests, results):
+            assert result == [sen.upper() for sen in request]
+        # all four sentences fit in a single model call, sorted by length
+        assert len(calls) == 1, calls
+        assert [len(sen) for sen in calls[0][0]] == sorted(len(sen) for sen in calls[0][0])
+
+    def test_max_batch_size_and_speakers(self):
+        calls = []
+
+        def synthesize_fn(sentences, speaker_idx):
+            calls.append((list(sentences), speaker_idx))
+            return [(sen, speaker_idx) for sen in sentences]
+
+        scheduler = BatchScheduler(synthesize_fn, max_batch_size=2, max_wait_ms=50)
+        future_1 = scheduler.submit(['a.', 'b.', 'c.'], speaker_idx=0)
+        future_2 = scheduler.submit(['d.'], speaker_idx=1)
+        assert future_1.result(timeout=5) == [('a.', 0), ('b.', 0), ('c.', 0)]
+        assert future_2.result(timeout=5) == [('d.', 1)]
+        for sentences, speaker_idx in calls:
+            assert len(sentences) <= 2
+            # sentences of different speakers are never mixed
+            assert speaker_idx == (1 if sentences == ['d.'] else 0)
+
+    def test_errors_and_queue_limit(self):
+        event = threading.Event()
+
+        def synthesize_fn(sentences, speaker_idx):  # pylint: disable=unused-argument
+            event.wait(5)
+            raise RuntimeError("model failure")
+
+        scheduler = BatchScheduler(synthesize_fn, max_batch_size=1, max_wait_ms=0, max_queue_size=1)
+        future = scheduler.submit(['a.'])
+        # wait for the worker to pick up the first request
+        while not scheduler.queue.empty():
+            time.sleep(0.01)
+        scheduler.submit(['b.'])
+        with self.assertRaises(queue.Full):
+            scheduler.submit(['c.'])
+        event.set()
+        with self.assertRaises(RuntimeError):
+            future.result(timeout=5)
+        assert scheduler.submit([]).result(timeout=5) == []
+
+    def test_errors_fail_the_whole_round(self):
+        calls = []
+
+        def synthesize_fn(sentences, speaker_idx):  # pylint: disable=unused-argument
+            calls.append(list(sentences))
+            if len(calls) == 1:
+                raise RuntimeError("model failure")
+            return list(sentences)
+
+        scheduler = BatchScheduler(synthesize_fn, max_batch_size=2, max_wait_ms=200)
+        futures = [scheduler.submit(['a.'], speaker_idx=0), scheduler.submit(['b.'], speaker_idx=1)]
+        # both requests are collected in the same round, which fails at its first batch
+        for future in futures:
+            with self.assertRaises(RuntimeError):
+                future.result(timeout=5)
+        assert calls == [['a.']]
+        # the worker keeps serving later requests
+        assert scheduler.submit(['c.']).result(timeout=5) == ['c.']
+
+    def test_cancel(self):
+        calls = []
+        started = threading.Event()
+        event = threading.Event()
+
+        def synthesize_fn(sentences, speaker_idx):  # pylint: disable=unused-argument
+            calls.append(list(sentences))
+            started.set()
+            event.wait(5)
+            return list(sentences)
+
+        scheduler = BatchScheduler(synthesize_fn, max_batch_size=2, max_wait_ms=0)
+        running_futures = [scheduler.submit(['a.'])]
+        started.wait(5)
+        # queued requests can be cancelled and are never synthesized
+        queued_future = scheduler.submit(['b.'])
+        assert queued_future.cancel()
+        # a request in a batch being synthesized cannot be cancelled, e.g. on a client timeout
+        assert not running_futures[0].cancel()
+        event.set()
+        assert running_futures[0].result(timeout=5) == ['a.']
+        assert scheduler.submit(['c.']).result(timeout=5) == ['c.']
+        assert calls == [['a.'], ['c.']]
@@ -76,6 +76,38 @@ class TacotronTrainTest(unittest.TestCase):
             count += 1
 
 
+class TacotronInferenceBatchTest(unittest.TestCase):
+    def test_inference_batch(self):  # pylint: disable=no-self-use
+        input_dummy = torch.randint(0, 24, (3, 20)).long().to(device)
+        input_lengths = torch.LongTensor([20, 15, 9]).to(device)
+        model = Tacotron2(num_chars=24, r=c.r).to(device)
+        model.eval()
+        model.decoder.max_decoder_steps = 20
+        mel_out, mel_postnet_out, align, stop_tokens, output_lengths = model.inference_batch(
+            input_dummy, input_lengths)
+        assert mel_postnet_out.shape[0] == 3
+        assert mel_postnet_out.shape[1] == output_lengths.max()
+        assert mel_postnet_out.shape[2] == c.audio['num_mels']
+        # frames after each sample stopped are masked
+        for idx, length in enumerate(output_lengths):
+            assert mel_postnet_out[idx, length:].abs().sum() == 0
+
+    def test_inference_batch_matches_inference(self):  # pylint: disable=no-self-use
+        input_dummy = torch.randint(0, 24, (3, 20)).long().to(device)
+        input_lengths = torch.LongTensor([9, 20, 15]).to(device)
+        model = Tacotron2(num_chars=24, r=c.r).to(device)
+        model.eval()
+        model.decoder.max_decoder_steps = 20
+        mel_out, mel_postnet_out, _, _, output_lengths = model.inference_batch(input_dummy, input_lengths)
+        # padding of the shorter samples does not change their outputs
+        with torch.no_grad():
+            for idx, length in enumerate(input_lengths):
+                ref_mel_out, ref_mel_postnet_out, _, _ = model.inference(input_dummy[idx:idx + 1, :length])
+                assert output_lengths[idx] == ref_mel_out.shape[1]
+                assert torch.allclose(mel_out[idx, :output_lengths[idx]], ref_mel_out[0], atol=1e-4)
+                assert torch.allclose(mel_postnet_out[idx, :output_lengths[idx]], ref_mel_postnet_out[0], atol=1e-4)
+
+
 class MultiSpeakeTacotronTrainTest(unittest.TestCase):
     @staticmethod
     def test_train_step():
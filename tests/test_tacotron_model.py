@@ -89,6 +89,31 @@ class TacotronTrainTest(unittest.TestCase):
                 count, param.shape, param, param_ref)
             count += 1
 
+class TacotronInferenceBatchTest(unittest.TestCase):
+    def test_inference_batch_matches_inference(self):  # pylint: disable=no-self-use
+        input_dummy = torch.randint(0, 24, (3, 20)).long().to(device)
+        input_lengths = torch.LongTensor([9, 20, 15]).to(device)
+        model = Tacotron(
+            num_chars=24,
+            postnet_output_dim=c.audio['fft_size'],
+            decoder_output_dim=c.audio['num_mels'],
+            r=c.r,
+            memory_size=c.memory_size
+        ).to(device)
+        model.eval()
+        model.decoder.max_decoder_steps = 20
+        mel_out, linear_out, _, _, output_lengths = model.inference_batch(input_dummy, input_lengths)
+        assert linear_out.shape[2] == c.audio['fft_size']
+        # padding of the shorter samples does not leak into the CBHG convolutions and GRUs
+        with torch.no_grad():
+            for idx, length in enumerate(input_lengths):
+                ref_mel_out, ref_linear_out, _, _ = model.inference(input_dummy[idx:idx + 1, :length])
+                assert output_lengths[idx] == ref_mel_out.shape[1]
+                assert torch.allclose(mel_out[idx, :output_lengths[idx]], ref_mel_out[0], atol=1e-4)
+                assert torch.allclose(linear_out[idx, :output_lengths[idx]], ref_linear_out[0], atol=1e-4)
+                assert linear_out[idx, output_lengths[idx]:].abs().sum() == 0
+
+
 class MultiSpeakeTacotronTrainTest(unittest.TestCase):
     @staticmethod
     def test_train_step():
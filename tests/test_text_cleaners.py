@@ -1,6 +1,14 @@
 #!/usr/bin/env python3
 
-from TTS.tts.utils.text.cleaners import english_cleaners, phoneme_cleaners
+import os
+import re
+import time
+import unittest
+
+from TTS.tts.utils.text.abbreviations import abbreviations_en
+from TTS.tts.utils.text.cleaners import (collapse_whitespace, convert_to_ascii, english_cleaners, expand_numbers,
+                                         lowercase, phoneme_cleaners, remove_aux_symbols, replace_symbols)
+from TTS.tts.utils.text.time import expand_time_english
 
 
 def test_time() -> None:
@@ -19,3 +27,46 @@ def test_currency() -> None:
 def test_expand_numbers() -> None:
     assert "minus one" == phoneme_cleaners("-1")
     assert "one" == phoneme_cleaners("1")
+
+
+def _reference_english_cleaners(text):
+    """english_cleaners applying every step to the whole string."""
+    text = convert_to_ascii(text)
+    text = lowercase(text)
+    text = expand_time_english(text)
+    text = expand_numbers(text)
+    for regex, replacement in abbreviations_en:
+        text = re.sub(regex, replacement, text)
+    text = replace_symbols(text)
+    text = remove_aux_symbols(text)
+    text = collapse_whitespace(text)
+    return text
+
+
+_PROMPTS = [
+    "Thank you for calling. Please hold while we connect you to Dr. Smith.",
+    "Your appointment with Mrs. Jones is on Capt. Street; press one to confirm.",
+    "Your balance is $1,250.75 as of 9:30 am - say \"agent\" (or press zero).",
+    "Welcome to St. Louis Co. Ltd. & partners: our offices open at 08:15.",
+    "Café Müller [main office] <closed> on the 3rd of May, Lt. Col. Brown.",
+    "Please   say   your   account   number   after   the   tone.",
+]
+
+
+def test_english_cleaners_equivalence() -> None:
+    for text in _PROMPTS:
+        assert english_cleaners(text) == _reference_english_cleaners(text), text
+
+
+@unittest.skipUnless(os.environ.get('TTS_BENCHMARK'), 'set TTS_BENCHMARK=1 to run the benchmarks')
+def test_english_cleaners_benchmark() -> None:
+    corpus = _PROMPTS * 500
+    start = time.time()
+    reference = [_reference_english_cleaners(text) for text in corpus]
+    reference_time = time.time() - start
+    start = time.time()
+    outputs = [english_cleaners(text) for text in corpus]
+    cleaner_time = time.time() - start
+    print(" > english_cleaners: {:.3f}s, step by step: {:.3f}s for {} texts".format(
+        cleaner_time, reference_time, len(corpus)))
+    assert outputs == reference
@@ -172,3 +172,32 @@ def test_text2phone():
     lang = "en-us"
     ph = text2phone(text, lang)
     assert gt == ph
+
+
+def test_phoneme_to_sequence_batch():
+    texts = ["Be a voice, not an echo!", "Recent research at Harvard has shown meditating."]
+    text_cleaner = ["phoneme_cleaners"]
+    lang = "en-us"
+    phoneme_cache.clear()
+    sequences = phoneme_to_sequence_batch(texts, text_cleaner, lang, add_blank=True)
+    phoneme_cache.clear()
+    for text, sequence in zip(texts, sequences):
+        assert sequence == phoneme_to_sequence(text, text_cleaner, lang, add_blank=True)
+    assert text2phone_batch(texts, lang) == [text2phone(text, lang) for text in texts]
+
+
+def test_tokenizer():
+    tp = {'pad': '_', 'eos': '~', 'bos': '^', 'characters': 'abc ', 'punctuations': '!', 'phonemes': 'əl'}
+    tokenizer = get_tokenizer(tp)
+    # one shared instance per config
+    assert tokenizer is get_tokenizer(dict(tp))
+    assert get_tokenizer() is not tokenizer
+    # two vocabularies used side by side do not affect each other
+    assert text_to_sequence("abd c", [], tp=tp) == [3, 4, 6, 5]
+    assert text_to_sequence("abd c", []) == text_to_sequence("abd c", [], tp=conf.characters)
+    assert sequence_to_text(text_to_sequence("ab c", [], tp=tp, add_blank=True), tp=tp, add_blank=True) == "ab c"
+    ids = tokenizer.phonemes_to_ids("l|ə| |x|!", enable_eos_bos=True)
+    assert ids == [2, 3, 4, 5, 1]
+    assert tokenizer.phonemes_to_ids_batch(["l|ə| |x|!", "", "ə"], enable_eos_bos=True, add_blank=True) == \
+        [tokenizer.phonemes_to_ids(ph, enable_eos_bos=True, add_blank=True) for ph in ["l|ə| |x|!", "", "ə"]]
+    assert sequence_to_phoneme(ids, tp=tp) == "^lə!~"
@@ -0,0 +1,43 @@
+import os
+import unittest
+
+import numpy as np
+
+from tests import get_tests_input_path
+from TTS.utils.audio import AudioProcessor
+from TTS.utils.io import load_config
+from TTS.vocoder.utils.generic_utils import VocoderInputAdapter, interpolate_vocoder_input
+
+conf = load_config(os.path.join(get_tests_input_path(), 'test_config.json'))
+
+
+def _reference(spec, tts_ap, vocoder_ap):
+    """Denormalize, renormalize and interpolate a [T, C] spectrogram step by step."""
+    spec = vocoder_ap.normalize(tts_ap.denormalize(spec.T))
+    return interpolate_vocoder_input([1, vocoder_ap.sample_rate / tts_ap.sample_rate], spec)[0].numpy()
+
+
+class VocoderInputAdapterTest(unittest.TestCase):
+    def _test(self, tts_config, vocoder_config):
+        tts_ap = AudioProcessor(**tts_config)
+        vocoder_ap = AudioProcessor(**vocoder_config)
+        adapter = VocoderInputAdapter(tts_ap, vocoder_ap)
+        specs = [np.random.uniform(-5, 5, (length, tts_ap.num_mels)).astype(np.float32) for length in [50, 31, 7]]
+        vocoder_input, lengths = adapter(specs)
+        assert vocoder_input.shape[:2] == (3, vocoder_ap.num_mels)
+        for idx, spec in enumerate(specs):
+            reference = _reference(spec, tts_ap, vocoder_ap)
+            assert lengths[idx] == reference.shape[1]
+            assert np.allclose(vocoder_input[idx, :, :lengths[idx]].numpy(), reference, atol=1e-4)
+            assert vocoder_input[idx, :, lengths[idx]:].abs().sum() == 0
+
+    def test_same_config(self):
+        audio_config = dict(conf.audio, stats_path=None, verbose=False)
+        self._test(audio_config, audio_config)
+
+    def test_different_normalization_and_sample_rate(self):
+        tts_config = dict(conf.audio, stats_path=None, verbose=False)
+        vocoder_config = dict(tts_config, sample_rate=24000, symmetric_norm=False, max_norm=1.0, ref_level_db=0)
+        self._test(tts_config, vocoder_config)
+        vocoder_config = dict(tts_config, sample_rate=16000, mel_fmax=7600, clip_norm=False)
+        self._test(tts_config, vocoder_config)
@@ -29,3 +29,4 @@ def test_wavernn():
     assert np.all(output.shape == (2, 1280, 4 * 256)), output.shape
     output = model.inference(dummy_y, True, 5500, 550)
     assert np.all(output.shape == (256 * (y_size - 1),))
+    assert output.dtype == np.float32